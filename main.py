@@ -6,7 +6,12 @@ AstrBot 群发言统计插件
 # 标准库导入
 import asyncio
 import os
+import random
+import re
+import time
+import types
 import aiofiles
+import aiofiles.os
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict, Any
 
@@ -21,12 +26,12 @@ from astrbot.api import logger as astrbot_logger
 
 # 本地模块导入
 from .utils.data_manager import DataManager
-from .utils.image_generator import ImageGenerator, ImageGenerationError
-from .utils.validators import Validators
+from .utils.validators import Validators, ValidationError
+from .utils.file_utils import read_json_sync, write_json_sync
 
 from .utils.models import (
     UserData, PluginConfig, GroupInfo, MessageDate, 
-    RankType
+    RankType, RankEntry, format_rank_title, DISPLAY_TOTAL_KEY
 )
 
 # 异常处理装饰器导入
@@ -51,13 +56,88 @@ from .utils.exception_handlers import (
 
 # 缓存配置
 CACHE_TTL_SECONDS = 300
-USER_NICKNAME_CACHE_TTL = 300  # 5分钟缓存，平衡准确性和性能
+MEMBERS_FAILOVER_TTL_SECONDS = 6 * 3600  # 群成员故障转移缓存保留时间，API失败或后台刷新期间使用
+PREWARM_CONCURRENCY = 4  # 启动预热群成员缓存时的最大并发请求数
+PREWARM_STAGGER_SECONDS = 2  # 启动预热请求的随机错峰上限（秒）
+MEMBERS_SNAPSHOT_FILE = "members_cache.json"  # 群成员/群名称缓存快照文件名，重启时用于避免冷启动
+MEMBERS_SNAPSHOT_MAX_AGE = 3600  # 缓存快照的最大有效期（秒），超过后不再加载
+RANK_IMAGE_CACHE_MAXSIZE = 256  # 排行榜图片缓存最大数量
+RANK_IMAGE_CACHE_TTL = 60  # 排行榜图片缓存时间（秒），数据未变化时直接复用已渲染图片
+RANK_FILTER_CACHE_MAXSIZE = 256  # 排行榜筛选结果缓存最大数量
+RANK_FILTER_CACHE_TTL = 60  # 排行榜筛选结果缓存时间（秒），数据写入或清除时主动失效
 MAX_RANK_COUNT = 100
 
+# 发言计数批量写入配置
+FLUSH_INTERVAL_SECONDS = 5  # 聚合计数的定期落盘间隔（秒）
+FLUSH_MAX_PENDING = 500  # 累计增量达到该值时提前落盘
+MSG_QUEUE_MAXSIZE = 10000  # 待统计消息队列容量
+MSG_BATCH_SIZE = 500  # 消费者单批处理的最大消息数
+
 # 配置键名
 RANK_COUNT_KEY = 'rand'
 IMAGE_MODE_KEY = 'if_send_pic'
 
+# 定时推送群组ID格式（5位以上数字）
+_GID_RE = re.compile(r'\d{5,}')
+
+# 命令回复文本（只读映射，集中管理以避免各命令方法重复持有相同的字符串常量）
+_MSG = types.MappingProxyType({
+    'need_group_context': "无法获取群组信息,请在群聊中使用此命令！",
+    'need_count_arg': "请指定数量！用法:#设置发言榜数量 10",
+    'count_not_number': "数量必须是数字！",
+    'set_failed': "设置失败,请稍后重试",
+    'need_mode_arg': "请指定模式！用法:#设置发言榜图片 1",
+    'mode_arg_invalid': "模式参数错误！可用:1/true/开 或 0/false/关",
+    'rank_cleared': "本群发言榜单已清除！",
+    'rank_clear_failed': "清除榜单失败,请稍后重试！",
+    'cache_refreshed': "群成员缓存已刷新！",
+    'cache_refresh_failed': "刷新缓存失败,请稍后重试！",
+    'cache_status_failed': "获取缓存状态失败,请稍后重试！",
+    'rank_data_unavailable': "无法获取排行榜数据,请检查群组信息或稍后重试",
+    'file_op_failed': "文件操作失败,请检查权限",
+    'data_format_error': "数据格式错误,请联系管理员",
+    'network_failed': "网络请求失败,请稍后重试",
+    'system_error': "系统错误,请联系管理员",
+    'timer_status_failed': "获取定时状态失败，请稍后重试！",
+    'manual_push_no_manager': "定时管理器未初始化，无法执行手动推送！",
+    'manual_push_no_context': "❌ 定时管理器未完全初始化！\n\n💡 可能的原因：\n• 插件初始化过程中出现异常\n• 上下文信息缺失\n\n🔧 解决方案：\n• 重启机器人或重新加载插件\n• 检查插件配置是否正确",
+    'manual_push_no_groups': "未设置目标群组，请先使用 #设置定时群组 设置目标群组！",
+    'manual_push_running': "正在执行手动推送，请稍候...",
+    'manual_push_ok': "✅ 手动推送执行成功！",
+    'manual_push_failed': "❌ 手动推送执行失败！\n\n💡 可能的原因：\n• 缺少 unified_msg_origin\n• 群组权限不足\n\n🔧 解决方案：\n• 在群组中发送任意消息以收集 unified_msg_origin\n• 检查机器人是否有群组发言权限",
+    'request_failed': "处理请求失败，请稍后重试！",
+    'need_time_arg': "请指定时间！用法:#设置定时时间 16:12",
+    'time_format_hint': "时间格式错误！请使用 HH:MM 格式，例如：16:12",
+    'no_current_group': "无法获取当前群组ID！",
+    'time_format_error': "时间格式错误，请使用 HH:MM 格式！",
+    'save_config_failed': "保存配置失败，请稍后重试！",
+    'need_groups_arg': "请指定群组ID！用法:#设置发言榜定时群组 123456789 987654321",
+    'group_id_invalid': "群组ID格式错误，请输入有效的群组ID！",
+    'groups_cleared': "✅ 已清空所有定时推送目标群组",
+    'groups_not_found': "⚠️ 未找到要删除的群组",
+    'need_groups_first': "请先设置目标群组！用法:#设置定时群组 群组ID",
+    'timer_no_context': "⚠️ 定时管理器未完全初始化！\n\n💡 可能的原因：\n• 插件初始化过程中出现异常\n• 上下文信息缺失\n\n🔧 解决方案：\n• 重启机器人或重新加载插件\n• 检查插件配置是否正确",
+    'timer_enabled': "✅ 定时推送功能已启用！",
+    'timer_enable_failed': "⚠️ 定时推送功能启用失败，请检查配置！",
+    'timer_no_manager': "⚠️ 定时管理器未初始化！",
+    'timer_already_disabled': "定时推送已处于禁用状态",
+    'timer_disabled': "✅ 定时推送功能已禁用！",
+    'need_type_arg': "请指定排行榜类型！用法:#设置定时类型 total/daily/week/month",
+    'timer_type_invalid': "排行榜类型错误，请使用：total/daily/weekly/monthly",
+    'count_out_of_range': "数量必须在{min}-{max}之间！",
+    'count_set': "排行榜显示人数已设置为 {count} 人！",
+    'mode_set': "排行榜显示模式已设置为 {mode}！",
+    'timer_saved_no_manager': "✅ 定时推送配置已保存！\n• 推送时间：{time}\n• 目标群组：{group}\n• 排行榜类型：{rank}\n• 状态：配置保存成功\n\n💡 提示：定时管理器未初始化，请检查插件配置",
+    'group_id_format': "群组ID格式错误: {group}，必须是5位以上数字",
+    'groups_set': "✅ 定时推送目标群组已设置：\n{groups}",
+    'groups_removed': "✅ 已删除定时推送目标群组：\n{removed}\n\n📋 剩余群组：\n{remaining}",
+    'timer_type_unknown': "排行榜类型错误！可用类型: {types}",
+    'timer_type_set': "✅ 定时推送排行榜类型已设置为 {type}！",
+    'timer_set_result': "{emoji} 定时推送设置{result}！\n• 推送时间：{time}\n• 目标群组：{group}\n• 排行榜类型：{rank}\n• 状态：{status}\n\n💡 提示：如果推送失败，请在群组中发送任意消息以收集unified_msg_origin",
+    'op_failed': "{op}失败，请稍后重试",
+})
+
+
 @register("astrbot_plugin_message_stats", "xiaoruange39", "群发言统计插件", "1.7.0")
 class MessageStatsPlugin(Star):
     """群发言统计插件
@@ -85,7 +165,7 @@ class MessageStatsPlugin(Star):
         data_manager (DataManager): 数据管理器,负责数据的存储和读取
         plugin_config (PluginConfig): 插件配置对象
         image_generator (ImageGenerator): 图片生成器,用于生成排行榜图片
-        group_members_cache (TTLCache): 群成员列表缓存,5分钟TTL
+        group_members_dict_cache (TTLCache): 群成员字典缓存,5分钟TTL
         logger: 日志记录器
         initialized (bool): 插件初始化状态
         
@@ -107,6 +187,7 @@ class MessageStatsPlugin(Star):
         
         # 使用StarTools获取插件数据目录
         data_dir = StarTools.get_data_dir('message_stats')
+        self.members_snapshot_file = os.path.join(str(data_dir), MEMBERS_SNAPSHOT_FILE)
         
         # 初始化组件
         self.data_manager = DataManager(data_dir)
@@ -114,22 +195,50 @@ class MessageStatsPlugin(Star):
         # 使用AstrBot的标准配置系统
         self.config = config
         self.plugin_config = self._convert_to_plugin_config()
+        # 屏蔽用户ID集合，随配置加载一次性构建，每条消息只做集合查找
+        self._blocked_user_ids = self._build_blocked_user_ids()
         self.image_generator = None
         
         # 群组unified_msg_origin映射表 - 用于主动消息发送
         self.group_unified_msg_origins = {}
         
-        # 群成员列表缓存 - 5分钟TTL,减少API调用
-        self.group_members_cache = TTLCache(maxsize=100, ttl=CACHE_TTL_SECONDS)
+        # 群成员字典缓存 - 5分钟TTL,用户ID到显示名称的映射，在API获取时一次性构建，用于O(1)查找
+        self.group_members_dict_cache = TTLCache(maxsize=100, ttl=CACHE_TTL_SECONDS)
+        
+        # 群成员字典故障转移缓存 - 长TTL，主缓存过期后先返回旧数据并在后台刷新，API失败时兜底
+        self.group_members_failover = TTLCache(maxsize=50, ttl=MEMBERS_FAILOVER_TTL_SECONDS)
         
-        # 群成员字典缓存 - 用于快速查找群成员信息
-        self.group_members_dict_cache = {}
+        # 群名称缓存 - 由数据管理器的缓存管理器持有，与定时推送共用
+        self.group_name_cache = self.data_manager.cache_manager.group_name_cache
         
-        # 用户昵称缓存 - 缓存用户ID到昵称的映射，减少重复查找
-        self.user_nickname_cache = TTLCache(maxsize=500, ttl=USER_NICKNAME_CACHE_TTL)
+        # 排行榜图片缓存 - (群组ID, 标题, 群名, 当前用户, 榜单数据哈希) -> 图片路径
+        self.rank_image_cache = TTLCache(maxsize=RANK_IMAGE_CACHE_MAXSIZE, ttl=RANK_IMAGE_CACHE_TTL)
+        
+        # 排行榜筛选结果缓存 - (群组ID, 排行榜类型, 日期) -> 带display_total的用户列表
+        self.rank_filter_cache = TTLCache(maxsize=RANK_FILTER_CACHE_MAXSIZE, ttl=RANK_FILTER_CACHE_TTL)
+        
+        # 正在进行中的群成员API请求 - 同一群组的并发请求合并为一次
+        self._members_inflight = {}
+        self._background_tasks = set()
         
         # 定时任务管理器 - 延迟初始化
         self.timer_manager = None
+        
+        # 机器人自身ID - 首条消息时获取并缓存
+        self._self_id_str = None
+        
+        # 待落盘的发言计数 - (群组ID, 用户ID, 消息日期) -> (新增消息数, 最新昵称, 最后一条消息的时间戳)
+        self._pending_counts = {}
+        self._pending_total = 0
+        self._pending_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._flush_task = None
+        # 卸载时置位，通知落盘任务在当前一轮写入完成后退出（不取消，避免中断写入丢失计数）
+        self._flush_stopping = False
+        
+        # 待统计消息队列 - 监听器只入队，由单一消费者批量处理，不阻塞事件分发
+        self._msg_queue = asyncio.Queue(maxsize=MSG_QUEUE_MAXSIZE)
+        self._consumer_task = None
     
     def _convert_to_plugin_config(self) -> PluginConfig:
         """将AstrBot配置转换为插件配置对象"""
@@ -252,6 +361,19 @@ class MessageStatsPlugin(Star):
             # 步骤5: 设置缓存和最终初始化状态
             await self._setup_caches()
             
+            # 步骤6: 加载上次卸载时保存的群成员缓存快照，作为故障转移数据
+            await self._load_members_snapshot()
+            
+            # 步骤7: 启动消息消费者和发言计数的定期落盘任务
+            self._flush_stopping = False
+            self._consumer_task = asyncio.create_task(self._consume_messages())
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            
+            # 步骤8: 后台预热配置和已知群组的成员缓存（不阻塞初始化）
+            prewarm_task = asyncio.create_task(self._prewarm_caches())
+            self._background_tasks.add(prewarm_task)
+            prewarm_task.add_done_callback(self._background_tasks.discard)
+            
             self.logger.info("群发言统计插件初始化完成")
             
         except (OSError, IOError) as e:
@@ -285,8 +407,14 @@ class MessageStatsPlugin(Star):
         """
         # 更新插件配置（从AstrBot配置转换）
         self.plugin_config = self._convert_to_plugin_config()
-        
-        # 创建图片生成器
+        blocked_user_ids = self._build_blocked_user_ids()
+        if blocked_user_ids != self._blocked_user_ids:
+            # 屏蔽名单变化后，已缓存的排行榜筛选结果仍按旧名单过滤，需要全部丢弃
+            self.rank_filter_cache.clear()
+        self._blocked_user_ids = blocked_user_ids
+        
+        # 创建图片生成器（在此处导入，加载插件模块时不必加载图片生成器及其依赖检查）
+        from .utils.image_generator import ImageGenerator, ImageGenerationError
         self.image_generator = ImageGenerator(self.plugin_config)
         
         # 初始化图片生成器
@@ -409,6 +537,35 @@ class MessageStatsPlugin(Star):
         try:
             self.logger.info("群发言统计插件卸载中...")
             
+            # 停止消息消费者和定期落盘任务，并写入剩余的发言计数，避免数据丢失
+            # 消费者只在等待队列时让出控制权，可以直接取消
+            if self._consumer_task:
+                self._consumer_task.cancel()
+                try:
+                    await self._consumer_task
+                except asyncio.CancelledError:
+                    pass
+            # 落盘任务可能正在写入已从待写队列取出的计数，取消会丢失这部分计数，
+            # 因此只通知其退出并等待当前一轮写入完成
+            if self._flush_task:
+                self._flush_stopping = True
+                self._flush_event.set()
+                try:
+                    await self._flush_task
+                except (asyncio.CancelledError, Exception) as e:
+                    # 落盘任务异常退出时仍要继续下面的最终落盘和资源清理
+                    self.logger.error(f"等待定期落盘任务结束失败: {e!r}", exc_info=True)
+            self._consumer_task = None
+            self._flush_task = None
+            await self._flush_pending_counts()
+            
+            # 取消尚未完成的后台刷新任务
+            for task in list(self._background_tasks):
+                task.cancel()
+            
+            # 清理已缓存的排行榜图片文件
+            await self._clear_rank_image_cache()
+            
             # 清理图片生成器
             if self.image_generator:
                 await self.image_generator.cleanup()
@@ -416,9 +573,10 @@ class MessageStatsPlugin(Star):
             # 清理数据缓存
             await self.data_manager.clear_cache()
             
-            # 清理群成员列表缓存
-            self.group_members_cache.clear()
-            self.logger.info("群成员列表缓存已清理")
+            # 保存群成员缓存快照后再清理，下次启动时可直接使用
+            await self._save_members_snapshot()
+            self.group_members_dict_cache.clear()
+            self.logger.info("群成员缓存已清理")
             
             self.initialized = False
             self.logger.info("群发言统计插件卸载完成")
@@ -433,46 +591,64 @@ class MessageStatsPlugin(Star):
         """自动消息监听器 - 监听所有消息并记录群成员发言统计"""
         # 跳过命令消息
         message_str = getattr(event, 'message_str', '')
-        if message_str.startswith(('%', '/')):
+        if message_str and message_str[0] in '%/':
             return
         
-        # 获取基本信息
+        # 跳过非群聊消息（先检查群组，私聊消息无需再获取发送者）
         group_id = event.get_group_id()
-        user_id = event.get_sender_id()
+        if not group_id:
+            return
         
-        # 跳过非群聊或无效用户
-        if not group_id or not user_id:
+        # 跳过无效用户
+        user_id = event.get_sender_id()
+        if not user_id:
             return
         
-        # 转换为字符串并跳过机器人
+        # 转换为字符串并跳过机器人和屏蔽用户（在任何await和昵称获取之前）
         group_id, user_id = str(group_id), str(user_id)
-        if self._is_bot_message(event, user_id):
+        if self._is_bot_message(event, user_id) or self._is_blocked_user(user_id):
             return
         
-        # 收集群组的unified_msg_origin（重要：用于定时推送）
-        await self._collect_group_unified_msg_origin(event)
+        # 收集群组的unified_msg_origin（重要：用于定时推送），未变化时直接跳过
+        if self.group_unified_msg_origins.get(group_id) != event.unified_msg_origin:
+            await self._collect_group_unified_msg_origin(event)
         
-        # 获取用户昵称并记录统计
+        # 获取用户昵称，连同收到消息的时间交给消费者记录统计（按消息时间而不是落盘时间计日期）
         nickname = await self._get_user_display_name(event, group_id, user_id)
-        await self._record_message_stats(group_id, user_id, nickname)
-    
-    def _is_bot_message(self, event: AstrMessageEvent, user_id: str) -> bool:
-        """检查是否为机器人消息"""
+        timestamp = int(time.time())
         try:
-            self_id = event.get_self_id()
-            return self_id and user_id == str(self_id)
-        except (AttributeError, KeyError, TypeError):
-            return False
+            self._msg_queue.put_nowait((group_id, user_id, nickname, timestamp))
+        except asyncio.QueueFull:
+            # 队列已满时不阻塞监听器，也不丢弃消息：直接累加到内存计数中
+            await self._record_message_stats(group_id, user_id, nickname, timestamp)
+            if self.plugin_config.detailed_logging_enabled:
+                self.logger.debug(f"待统计消息队列已满，群 {group_id} 用户 {user_id} 的消息直接计入内存计数")
     
-    async def _record_message_stats(self, group_id: str, user_id: str, nickname: str):
+    def _is_bot_message(self, event: AstrMessageEvent, user_id: str) -> bool:
+        """检查是否为机器人消息
+        
+        机器人ID在插件生命周期内不变，首次获取后缓存，之后只做字符串比较。
+        """
+        if self._self_id_str is None:
+            try:
+                self_id = event.get_self_id()
+            except (AttributeError, KeyError, TypeError):
+                return False
+            if not self_id:
+                return False
+            self._self_id_str = str(self_id)
+        return user_id == self._self_id_str
+    
+    async def _record_message_stats(self, group_id: str, user_id: str, nickname: str, timestamp: int):
         """记录消息统计
         
-        内部方法,用于记录群成员的消息统计数据.会自动验证输入参数并更新数据.
+        内部方法,用于记录群成员的消息统计数据.计数先在内存中累加,参数验证在批量落盘时进行.
         
         Args:
             group_id (str): 群组ID,必须是5-12位数字字符串
             user_id (str): 用户ID,必须是1-20位数字字符串
             nickname (str): 用户昵称,会进行HTML转义和安全验证
+            timestamp (int): 收到消息的时间戳,用于确定消息日期
             
         Raises:
             ValueError: 当参数验证失败时抛出
@@ -483,7 +659,7 @@ class MessageStatsPlugin(Star):
             None: 无返回值,记录结果通过日志输出
             
         Example:
-            >>> await self._record_message_stats("123456789", "987654321", "用户昵称")
+            >>> await self._record_message_stats("123456789", "987654321", "用户昵称", int(time.time()))
             # 将在数据管理器中更新该用户的发言统计
         """
         try:
@@ -498,12 +674,8 @@ class MessageStatsPlugin(Star):
                 nickname = f"用户{user_id}"
                 self.logger.warning(f"昵称获取失败，使用默认昵称: {nickname}")
             
-            # 步骤2: 验证输入数据
-            validated_data = await self._validate_message_data(group_id, user_id, nickname)
-            group_id, user_id, nickname = validated_data
-            
-            # 步骤3: 处理消息统计和记录
-            await self._process_message_stats(group_id, user_id, nickname)
+            # 步骤2: 累加发言计数（参数验证推迟到落盘时，每个用户每个周期只验证一次）
+            await self._process_message_stats(group_id, user_id, nickname, timestamp)
             
         except ValueError as e:
             self.logger.error(f"记录消息统计失败(参数验证错误): {e}", exc_info=True)
@@ -529,11 +701,11 @@ class MessageStatsPlugin(Star):
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"记录消息统计失败(系统资源错误): {e}", exc_info=True)
     
-    @data_operation_handler('validate', '消息数据参数')
-    async def _validate_message_data(self, group_id: str, user_id: str, nickname: str) -> tuple:
+    def _validate_message_data(self, group_id: str, user_id: str, nickname: str) -> Optional[tuple]:
         """验证消息数据参数
         
         验证输入的群组ID、用户ID和昵称参数，确保数据格式正确。
+        在落盘时对每个 (群组, 用户) 调用一次；ID验证结果由 Validators 内部缓存。
         
         Args:
             group_id (str): 群组ID
@@ -541,68 +713,238 @@ class MessageStatsPlugin(Star):
             nickname (str): 用户昵称
             
         Returns:
-            tuple: 验证后的 (group_id, user_id, nickname) 元组
-            
-        Raises:
-            ValueError: 当参数验证失败时抛出
-            TypeError: 当参数类型错误时抛出
+            Optional[tuple]: 验证后的 (group_id, user_id, nickname) 元组，验证失败时返回None
         """
-        # 验证数据
-        group_id = Validators.validate_group_id(group_id)
-        user_id = Validators.validate_user_id(user_id)
-        nickname = Validators.validate_nickname(nickname)
-        
-        return group_id, user_id, nickname
+        try:
+            return (
+                Validators.validate_group_id(group_id),
+                Validators.validate_user_id(user_id),
+                Validators.validate_nickname(nickname),
+            )
+        except (ValidationError, ValueError, TypeError) as e:
+            self.logger.warning(f"发言统计参数验证失败，已跳过 群组{group_id} 用户{user_id}: {e}")
+            return None
     
-    async def _process_message_stats(self, group_id: str, user_id: str, nickname: str):
+    async def _process_message_stats(self, group_id: str, user_id: str, nickname: str, timestamp: int):
         """处理消息统计和记录
         
-        执行实际的消息统计更新操作，并记录结果日志。
-        智能缓存管理：检查昵称变化，只在必要时更新缓存。
+        只在内存中累加发言计数，由后台任务定期批量落盘，
+        把每条消息一次的写入合并为每个落盘周期每个群组一次。
+        计数按消息日期分开累加，跨零点或落盘重试时不会记到落盘当天。
         
         Args:
-            group_id (str): 验证后的群组ID
-            user_id (str): 验证后的用户ID
-            nickname (str): 验证后的用户昵称
+            group_id (str): 群组ID
+            user_id (str): 用户ID
+            nickname (str): 用户昵称（落盘时再进行验证和转义）
+            timestamp (int): 收到消息的时间戳
+        """
+        key = (group_id, user_id, date.fromtimestamp(timestamp))
+        count, _, _ = self._pending_counts.get(key, (0, nickname, timestamp))
+        self._pending_counts[key] = (count + 1, nickname, timestamp)
+        self._pending_total += 1
+        
+        # 累计增量过多时提前唤醒落盘任务
+        if self._pending_total >= FLUSH_MAX_PENDING:
+            self._flush_event.set()
+        
+        if self.plugin_config.detailed_logging_enabled:
+            self.logger.debug(f"记录消息统计: {nickname}")
+    
+    async def _consume_messages(self):
+        """消息消费者
+        
+        等待队列中的消息，每次最多取 MSG_BATCH_SIZE 条批量累加到发言计数中，
+        实际写入由定期落盘任务完成。
+        """
+        while True:
+            batch = [await self._msg_queue.get()]
+            while len(batch) < MSG_BATCH_SIZE and not self._msg_queue.empty():
+                batch.append(self._msg_queue.get_nowait())
+            
+            for group_id, user_id, nickname, timestamp in batch:
+                await self._record_message_stats(group_id, user_id, nickname, timestamp)
+                self._msg_queue.task_done()
+    
+    async def _drain_message_queue(self):
+        """立即处理队列中剩余的全部消息（落盘和卸载前调用，保证计数完整）"""
+        while not self._msg_queue.empty():
+            group_id, user_id, nickname, timestamp = self._msg_queue.get_nowait()
+            await self._record_message_stats(group_id, user_id, nickname, timestamp)
+            self._msg_queue.task_done()
+    
+    async def _flush_loop(self):
+        """定期落盘任务
+        
+        每隔 FLUSH_INTERVAL_SECONDS 秒（或累计增量达到 FLUSH_MAX_PENDING 时）
+        将内存中聚合的发言计数批量写入数据管理器。卸载时由 _flush_stopping 通知退出，
+        剩余的计数由 terminate 最后一次落盘写入。
+        """
+        while not self._flush_stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            if self._flush_stopping:
+                break
+            await self._flush_pending_counts()
+    
+    async def _flush_pending_counts(self):
+        """将聚合的发言计数批量写入数据管理器
+        
+        写入失败时会把计数合并回待写队列，等待下一次落盘重试。
+        """
+        # 先处理尚在队列中的消息
+        await self._drain_message_queue()
+        
+        async with self._pending_lock:
+            if not self._pending_counts:
+                return
+            pending, self._pending_counts = self._pending_counts, {}
+            self._pending_total = 0
+            
+            # 落盘时统一验证，每个 (群组, 用户, 日期) 每个周期只验证一次
+            items = {}
+            for (group_id, user_id, message_date), (count, nickname, timestamp) in pending.items():
+                validated = self._validate_message_data(group_id, user_id, nickname)
+                if validated:
+                    items[(validated[0], validated[1], message_date)] = (count, validated[2], timestamp)
+            if not items:
+                return
             
-        Raises:
-            KeyError: 当数据格式错误时抛出
-            asyncio.TimeoutError: 当异步操作超时时抛出
-            ConnectionError: 当连接错误时抛出
-            asyncio.CancelledError: 当操作取消时抛出
-            IOError: 当文件操作错误时抛出
-            OSError: 当系统操作错误时抛出
-            AttributeError: 当属性访问错误时抛出
-            RuntimeError: 当运行时错误时抛出
-            ImportError: 当导入错误时抛出
-            FileNotFoundError: 当文件未找到时抛出
-            PermissionError: 当权限错误时抛出
-            UnicodeError: 当编码错误时抛出
-            MemoryError: 当内存错误时抛出
-            SystemError: 当系统错误时抛出
+            all_groups = {key[0] for key in items}
+            try:
+                failed_groups = await self.data_manager.bulk_update_user_messages(items)
+            except (ValueError, TypeError, KeyError) as e:
+                self.logger.error(f"批量写入发言统计失败(参数错误): {e}", exc_info=True)
+                return
+            except (IOError, OSError) as e:
+                self.logger.error(f"批量写入发言统计失败(系统错误): {e}", exc_info=True)
+                failed_groups = all_groups
+            except (RuntimeError, AttributeError) as e:
+                self.logger.error(f"批量写入发言统计失败(运行时错误): {e}", exc_info=True)
+                failed_groups = all_groups
+            
+            if failed_groups:
+                # 只把未写入的群组的计数合并回待写队列，保留期间新到达的计数和最新昵称
+                retry_count = 0
+                for key, (count, nickname, timestamp) in items.items():
+                    if key[0] not in failed_groups:
+                        continue
+                    pending_count, pending_nickname, pending_timestamp = self._pending_counts.get(
+                        key, (0, nickname, timestamp)
+                    )
+                    self._pending_counts[key] = (count + pending_count, pending_nickname, pending_timestamp)
+                    self._pending_total += count
+                    retry_count += 1
+                self.logger.warning(f"{len(failed_groups)} 个群组写入发言统计失败，{retry_count} 条记录将在下次落盘时重试")
+            
+            written_groups = all_groups - failed_groups
+            if not written_groups:
+                return
+            
+            self._invalidate_rank_filter_cache(written_groups)
+            if self.plugin_config.detailed_logging_enabled:
+                self.logger.debug(f"批量写入发言统计完成，共 {len(written_groups)} 个群组")
+    
+    def _get_platform_client(self):
+        """获取平台客户端（无事件对象时使用，目前仅支持aiocqhttp）
+        
+        Returns:
+            平台客户端对象，不可用时返回None
         """
-        # 直接使用data_manager更新用户消息
-        success = await self.data_manager.update_user_message(group_id, user_id, nickname)
+        try:
+            platform = self.context.get_platform(filter.PlatformAdapterType.AIOCQHTTP)
+            client = platform.get_client() if platform and hasattr(platform, 'get_client') else None
+            return client if client and hasattr(client, 'api') else None
+        except (AttributeError, KeyError, TypeError) as e:
+            self.logger.debug(f"获取平台客户端失败: {e}")
+            return None
+    
+    async def _prewarm_caches(self):
+        """启动时预热配置缓存和已知群组的成员缓存
         
-        if success:
-            # 智能缓存管理：检查昵称变化
-            nickname_cache_key = f"nickname_{user_id}"
-            cached_nickname = self.user_nickname_cache.get(nickname_cache_key)
+        限制并发并随机错峰，避免启动瞬间集中请求API；
+        预热完成后，首次命令可直接命中缓存。
+        """
+        try:
+            await self.data_manager.get_config()
             
-            # 只在昵称变化时才更新缓存（节省API调用）
-            if cached_nickname != nickname:
-                self.user_nickname_cache[nickname_cache_key] = nickname
-                
-                if self.plugin_config.detailed_logging_enabled:
-                    self.logger.debug(f"昵称发生变化，更新缓存: {cached_nickname} -> {nickname}")
-                    self.logger.info(f"记录消息统计: {nickname}")
-            else:
-                # 昵称未变化，只记录基本日志
-                if self.plugin_config.detailed_logging_enabled:
-                    self.logger.debug(f"昵称未变化，保持缓存: {nickname}")
-                    self.logger.info(f"记录消息统计: {nickname}")
-        else:
-            self.logger.error(f"记录消息统计失败: {nickname}")
+            client = self._get_platform_client()
+            if not client:
+                return
+            
+            known_groups = await self.data_manager.get_all_groups()
+            if not known_groups:
+                return
+            
+            semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+            
+            async def warm(group_id: str):
+                await asyncio.sleep(random.uniform(0, PREWARM_STAGGER_SECONDS))
+                async with semaphore:
+                    await self._fetch_group_members(client, group_id)
+            
+            await asyncio.gather(*(warm(group_id) for group_id in known_groups))
+            self.logger.info(f"群成员缓存预热完成，共 {len(known_groups)} 个群组")
+        except (IOError, OSError) as e:
+            self.logger.warning(f"预热缓存失败(系统错误): {e}")
+        except (AttributeError, KeyError, TypeError, ValueError, RuntimeError) as e:
+            self.logger.warning(f"预热缓存失败(运行时错误): {e}")
+    
+    async def _save_members_snapshot(self):
+        """将群成员字典缓存和群名称缓存保存到磁盘
+        
+        故障转移缓存包含主缓存中的全部群组，优先使用主缓存中较新的数据。
+        """
+        members = dict(self.group_members_failover.items())
+        prefix = "group_members_dict_"
+        for key, members_dict in self.group_members_dict_cache.items():
+            members[key[len(prefix):]] = members_dict
+        
+        if not members and not self.group_name_cache:
+            return
+        
+        snapshot = {
+            "members": members,
+            "group_names": dict(self.group_name_cache.items())
+        }
+        try:
+            # 序列化和写入放在同一次线程切换中，不阻塞事件循环；快照只由插件读取，使用紧凑格式
+            await asyncio.to_thread(write_json_sync, self.members_snapshot_file, snapshot, compact=True, sync_dir=True)
+            self.logger.info(f"群成员缓存快照已保存，共 {len(members)} 个群组")
+        except (IOError, OSError) as e:
+            self.logger.warning(f"保存群成员缓存快照失败(系统错误): {e}")
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"保存群成员缓存快照失败(数据错误): {e}")
+    
+    async def _load_members_snapshot(self):
+        """加载群成员缓存快照
+        
+        仅加载一小时内保存的快照；群成员数据放入故障转移缓存，
+        首次查询时直接返回并在后台刷新，避免重启后集中请求API。
+        """
+        try:
+            try:
+                mtime = await asyncio.to_thread(os.path.getmtime, self.members_snapshot_file)
+            except FileNotFoundError:
+                return
+            if time.time() - mtime > MEMBERS_SNAPSHOT_MAX_AGE:
+                return
+            
+            # 读取和解析在同一次线程切换中完成
+            snapshot = await asyncio.to_thread(read_json_sync, self.members_snapshot_file)
+            
+            members = snapshot.get("members", {})
+            for group_id, members_dict in members.items():
+                self.group_members_failover[group_id] = members_dict
+            for group_id, group_name in snapshot.get("group_names", {}).items():
+                self.group_name_cache[group_id] = group_name
+            self.logger.info(f"已加载群成员缓存快照，共 {len(members)} 个群组")
+        except (IOError, OSError) as e:
+            self.logger.warning(f"加载群成员缓存快照失败(系统错误): {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            self.logger.warning(f"加载群成员缓存快照失败(数据错误): {e}")
     
     # ========== 排行榜命令 ==========
     
@@ -641,26 +983,28 @@ class MessageStatsPlugin(Star):
             # 获取群组ID
             group_id = event.get_group_id()
             if not group_id:
-                yield event.plain_result("无法获取群组信息,请在群聊中使用此命令！")
+                yield event.plain_result(_MSG['need_group_context'])
                 return
             
             group_id = str(group_id)
             
             # 获取参数
-            args = event.message_str.split()[1:] if hasattr(event, 'message_str') else []
+            # 只拆出指令名和第一个参数，不切分整条消息
+            parts = event.message_str.split(maxsplit=2) if hasattr(event, 'message_str') else []
+            arg0 = parts[1] if len(parts) > 1 else None
             
-            if not args:
-                yield event.plain_result("请指定数量！用法:#设置发言榜数量 10")
+            if arg0 is None:
+                yield event.plain_result(_MSG['need_count_arg'])
                 return
             
             # 验证数量
             try:
-                count = int(args[0])
+                count = int(arg0)
                 if count < self.RANK_COUNT_MIN or count > self.MAX_RANK_COUNT:
-                    yield event.plain_result(f"数量必须在{self.RANK_COUNT_MIN}-{self.MAX_RANK_COUNT}之间！")
+                    yield event.plain_result(_MSG['count_out_of_range'].format(min=self.RANK_COUNT_MIN, max=self.MAX_RANK_COUNT))
                     return
             except ValueError:
-                yield event.plain_result("数量必须是数字！")
+                yield event.plain_result(_MSG['count_not_number'])
                 return
             
             # 保存配置
@@ -668,30 +1012,30 @@ class MessageStatsPlugin(Star):
             config.rand = count
             await self.data_manager.save_config(config)
             
-            yield event.plain_result(f"排行榜显示人数已设置为 {count} 人！")
+            yield event.plain_result(_MSG['count_set'].format(count=count))
             
         except ValueError as e:
             self.logger.error(f"设置排行榜数量失败(参数错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except TypeError as e:
             self.logger.error(f"设置排行榜数量失败(类型错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except KeyError as e:
             self.logger.error(f"设置排行榜数量失败(数据格式错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except (IOError, OSError, FileNotFoundError) as e:
             self.logger.error(f"设置排行榜数量失败(文件操作错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except AttributeError as e:
             self.logger.error(f"设置排行榜数量失败(属性错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except RuntimeError as e:
             self.logger.error(f"设置排行榜数量失败(运行时错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except (ConnectionError, asyncio.TimeoutError, ImportError, PermissionError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"设置排行榜数量失败(网络或系统错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
 
     @filter.command("设置发言榜图片")
     async def set_image_mode(self, event: AstrMessageEvent):
@@ -707,20 +1051,22 @@ class MessageStatsPlugin(Star):
             # 获取群组ID
             group_id = event.get_group_id()
             if not group_id:
-                yield event.plain_result("无法获取群组信息,请在群聊中使用此命令！")
+                yield event.plain_result(_MSG['need_group_context'])
                 return
             
             group_id = str(group_id)
             
             # 获取参数
-            args = event.message_str.split()[1:] if hasattr(event, 'message_str') else []
+            # 只拆出指令名和第一个参数，不切分整条消息
+            parts = event.message_str.split(maxsplit=2) if hasattr(event, 'message_str') else []
+            arg0 = parts[1] if len(parts) > 1 else None
             
-            if not args:
-                yield event.plain_result("请指定模式！用法:#设置发言榜图片 1")
+            if arg0 is None:
+                yield event.plain_result(_MSG['need_mode_arg'])
                 return
             
             # 验证模式
-            mode = args[0].lower()
+            mode = arg0.lower()
             if mode in self.IMAGE_MODE_ENABLE_ALIASES:
                 send_pic = 1
                 mode_text = "图片模式"
@@ -728,7 +1074,7 @@ class MessageStatsPlugin(Star):
                 send_pic = 0
                 mode_text = "文字模式"
             else:
-                yield event.plain_result("模式参数错误！可用:1/true/开 或 0/false/关")
+                yield event.plain_result(_MSG['mode_arg_invalid'])
                 return
             
             # 保存配置
@@ -736,30 +1082,30 @@ class MessageStatsPlugin(Star):
             config.if_send_pic = send_pic
             await self.data_manager.save_config(config)
             
-            yield event.plain_result(f"排行榜显示模式已设置为 {mode_text}！")
+            yield event.plain_result(_MSG['mode_set'].format(mode=mode_text))
             
         except ValueError as e:
             self.logger.error(f"设置图片模式失败(参数错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except TypeError as e:
             self.logger.error(f"设置图片模式失败(类型错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except KeyError as e:
             self.logger.error(f"设置图片模式失败(数据格式错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except (IOError, OSError, FileNotFoundError) as e:
             self.logger.error(f"设置图片模式失败(文件操作错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except AttributeError as e:
             self.logger.error(f"设置图片模式失败(属性错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except RuntimeError as e:
             self.logger.error(f"设置图片模式失败(运行时错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
         except (ConnectionError, asyncio.TimeoutError, ImportError, PermissionError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"设置图片模式失败(网络或系统错误): {e}", exc_info=True)
-            yield event.plain_result("设置失败,请稍后重试")
+            yield event.plain_result(_MSG['set_failed'])
     
     @filter.command("清除发言榜单")
     async def clear_message_ranking(self, event: AstrMessageEvent):
@@ -767,20 +1113,28 @@ class MessageStatsPlugin(Star):
         try:
             group_id = event.get_group_id()
             if not group_id:
-                yield event.plain_result("无法获取群组信息,请在群聊中使用此命令！")
+                yield event.plain_result(_MSG['need_group_context'])
                 return
             group_id = str(group_id)
             
+            # 丢弃该群尚未落盘的发言计数，避免清除后又被写回；
+            # 队列中尚未累加的消息先并入计数，否则会在清除之后才被统计
+            async with self._pending_lock:
+                await self._drain_message_queue()
+                for key in [key for key in self._pending_counts if key[0] == group_id]:
+                    self._pending_total -= self._pending_counts.pop(key)[0]
+            
             success = await self.data_manager.clear_group_data(group_id)
+            self._invalidate_rank_filter_cache({group_id})
             
             if success:
-                yield event.plain_result("本群发言榜单已清除！")
+                yield event.plain_result(_MSG['rank_cleared'])
             else:
-                yield event.plain_result("清除榜单失败,请稍后重试！")
+                yield event.plain_result(_MSG['rank_clear_failed'])
             
         except (IOError, OSError, FileNotFoundError) as e:
             self.logger.error(f"清除榜单失败: {e}")
-            yield event.plain_result("清除榜单失败,请稍后重试！")
+            yield event.plain_result(_MSG['rank_clear_failed'])
     
     @filter.command("刷新发言榜群成员缓存")
     async def refresh_group_members_cache(self, event: AstrMessageEvent):
@@ -788,84 +1142,63 @@ class MessageStatsPlugin(Star):
         try:
             group_id = event.get_group_id()
             if not group_id:
-                yield event.plain_result("无法获取群组信息,请在群聊中使用此命令！")
+                yield event.plain_result(_MSG['need_group_context'])
                 return
             group_id = str(group_id)
             
-            # 清除特定群的成员缓存
-            cache_key = f"group_members_{group_id}"
-            if cache_key in self.group_members_cache:
-                del self.group_members_cache[cache_key]
+            # 清除群成员字典缓存（重要！用于昵称获取）
+            dict_cache_key = f"group_members_dict_{group_id}"
+            if self.group_members_dict_cache.pop(dict_cache_key, None) is not None:
                 self.logger.info(f"刷新群 {group_id} 成员缓存")
             else:
                 self.logger.info(f"群 {group_id} 没有需要刷新的成员缓存")
             
-            # 清除群成员字典缓存（重要！用于昵称获取）
-            dict_cache_key = f"group_members_dict_{group_id}"
-            if dict_cache_key in self.group_members_dict_cache:
-                del self.group_members_dict_cache[dict_cache_key]
-                self.logger.info(f"刷新群 {group_id} 字典缓存")
-            
-            # 同时清除昵称缓存（快速修复昵称更新问题）
-            self.clear_user_cache()  # 清除所有用户昵称缓存
-            self.logger.info(f"刷新群 {group_id} 昵称缓存")
-            
             # 为现有用户更新最新昵称
             try:
                 group_data = await self.data_manager.get_group_data(group_id)
                 if group_data:
-                    # 获取群成员最新信息
-                    members_info = await self._fetch_group_members_from_api(event, group_id)
-                    if members_info:
-                        # 构建用户ID到最新昵称的映射
-                        member_nickname_map = {}
-                        for member in members_info:
-                            user_id = str(member.get("user_id", ""))
-                            if user_id:
-                                # 使用群的昵称获取逻辑
-                                display_name = self._get_display_name_from_member(member)
-                                if display_name:
-                                    member_nickname_map[user_id] = display_name
-                        
+                    # 获取群成员最新信息（用户ID到显示名称的字典）
+                    members_dict = await self._fetch_group_members_from_api(event, group_id)
+                    if members_dict:
                         # 更新用户数据中的昵称
                         updated_count = 0
                         for user in group_data:
-                            if user.user_id in member_nickname_map:
+                            new_nickname = members_dict.get(user.user_id)
+                            if new_nickname and user.nickname != new_nickname:
                                 old_nickname = user.nickname
-                                new_nickname = member_nickname_map[user.user_id]
-                                if old_nickname != new_nickname:
-                                    user.nickname = new_nickname
-                                    updated_count += 1
-                                    self.logger.info(f"更新用户 {user.user_id} 昵称: {old_nickname} -> {new_nickname}")
+                                user.nickname = new_nickname
+                                updated_count += 1
+                                self.logger.info(f"更新用户 {user.user_id} 昵称: {old_nickname} -> {new_nickname}")
                         
                         # 保存更新后的数据
                         if updated_count > 0:
                             await self.data_manager.save_group_data(group_id, group_data)
+                            self._invalidate_rank_filter_cache({group_id})
                             self.logger.info(f"群 {group_id} 共有 {updated_count} 个用户的昵称已更新")
             except Exception as e:
                 self.logger.error(f"更新用户昵称失败: {e}", exc_info=True)
             
-            yield event.plain_result("群成员缓存、字典缓存和昵称缓存已全部刷新！")
+            yield event.plain_result(_MSG['cache_refreshed'])
             
         except AttributeError as e:
             self.logger.error(f"刷新群成员缓存失败(属性错误): {e}", exc_info=True)
-            yield event.plain_result("刷新缓存失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_refresh_failed'])
         except KeyError as e:
             self.logger.error(f"刷新群成员缓存失败(数据格式错误): {e}", exc_info=True)
-            yield event.plain_result("刷新缓存失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_refresh_failed'])
         except TypeError as e:
             self.logger.error(f"刷新群成员缓存失败(类型错误): {e}", exc_info=True)
-            yield event.plain_result("刷新缓存失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_refresh_failed'])
         except (IOError, OSError) as e:
             self.logger.error(f"刷新群成员缓存失败(系统错误): {e}", exc_info=True)
-            yield event.plain_result("刷新缓存失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_refresh_failed'])
         except RuntimeError as e:
             self.logger.error(f"刷新群成员缓存失败(运行时错误): {e}", exc_info=True)
-            yield event.plain_result("刷新缓存失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_refresh_failed'])
         except (ConnectionError, asyncio.TimeoutError, ImportError, PermissionError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"刷新群成员缓存失败(网络或系统错误): {e}", exc_info=True)
-            yield event.plain_result("刷新缓存失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_refresh_failed'])
     
     @filter.command("发言榜缓存状态")
     async def show_cache_status(self, event: AstrMessageEvent):
@@ -875,8 +1208,8 @@ class MessageStatsPlugin(Star):
             cache_stats = await self.data_manager.get_cache_stats()
             
             # 获取群成员缓存信息
-            members_cache_size = len(self.group_members_cache)
-            members_cache_maxsize = self.group_members_cache.maxsize
+            members_cache_size = len(self.group_members_dict_cache)
+            members_cache_maxsize = self.group_members_dict_cache.maxsize
             
             status_msg = [
                 "📊 缓存状态报告",
@@ -885,7 +1218,7 @@ class MessageStatsPlugin(Star):
                 f"⚙️ 配置缓存: {cache_stats['config_cache_size']}/{cache_stats['config_cache_maxsize']}",
                 f"👥 群成员缓存: {members_cache_size}/{members_cache_maxsize}",
                 "━━━━━━━━━━━━━━",
-                "🕐 数据缓存TTL: 5分钟",
+                f"🕐 数据缓存: LRU，最多 {cache_stats['data_cache_maxsize']} 个群组，保存时更新，不按时间过期",
                 "🕐 配置缓存TTL: 1分钟", 
                 "🕐 群成员缓存TTL: 5分钟"
             ]
@@ -894,26 +1227,26 @@ class MessageStatsPlugin(Star):
             
         except ValueError as e:
             self.logger.error(f"显示缓存状态失败(参数错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
         except TypeError as e:
             self.logger.error(f"显示缓存状态失败(类型错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
         except KeyError as e:
             self.logger.error(f"显示缓存状态失败(数据格式错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
         except (IOError, OSError) as e:
             self.logger.error(f"显示缓存状态失败(系统错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
         except AttributeError as e:
             self.logger.error(f"显示缓存状态失败(属性错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
         except RuntimeError as e:
             self.logger.error(f"显示缓存状态失败(运行时错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
         except (ConnectionError, asyncio.TimeoutError, ImportError, PermissionError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"显示缓存状态失败(网络或系统错误): {e}", exc_info=True)
-            yield event.plain_result("获取缓存状态失败,请稍后重试！")
+            yield event.plain_result(_MSG['cache_status_failed'])
     
     # ========== 私有方法 ==========
     
@@ -928,28 +1261,14 @@ class MessageStatsPlugin(Star):
         
         return nickname
     
-    @data_operation_handler('extract', '群成员昵称数据')
-    def _get_display_name_from_member(self, member: Dict[str, Any]) -> Optional[str]:
-        """从群成员信息中提取显示昵称
-        
-        提取用户昵称的辅助函数，避免重复的逻辑
-        
-        Args:
-            member (Dict[str, Any]): 群成员信息字典
-            
-        Returns:
-            Optional[str]: 用户的显示昵称，如果获取失败则返回None
-        """
-        return member.get("card") or member.get("nickname")
-
     async def _get_user_nickname_unified(self, event: AstrMessageEvent, group_id: str, user_id: str) -> str:
         """统一的用户昵称获取方法 - 性能优先版本（缓存优先策略）
         
-        策略：采用分层缓存策略，性能最优
-        1. 从昵称缓存获取（最高效且常用）
-        2. 从群成员字典缓存获取（中等效率）
-        3. 从API获取（仅在前两级缓存失效时，确保准确性）
-        4. 返回默认昵称
+        策略：群成员字典缓存是昵称的唯一来源
+        1. 从群成员字典缓存获取（一次字典访问）；缓存有效但没有该用户时
+           直接返回默认昵称，不为每条消息重新请求成员列表
+        2. 从API获取（字典缓存失效时，优先使用旧数据并在后台刷新）
+        3. 返回默认昵称
         
         Args:
             event (AstrMessageEvent): 消息事件对象
@@ -959,73 +1278,31 @@ class MessageStatsPlugin(Star):
         Returns:
             str: 用户的显示昵称，如果都失败则返回 "用户{user_id}"
         """
-        # 步骤1: 从昵称缓存获取（最高效优先）
-        nickname = await self._get_from_nickname_cache(user_id)
-        if nickname:
-            return nickname
-        
-        # 步骤2: 从群成员字典缓存获取（中等效率）
-        nickname = await self._get_from_dict_cache(group_id, user_id)
-        if nickname:
-            return nickname
+        # 步骤1: 从群成员字典缓存获取（缓存有效期内不再请求API）
+        members_dict = self.group_members_dict_cache.get(f"group_members_dict_{group_id}")
+        if members_dict is not None:
+            return members_dict.get(user_id) or f"用户{user_id}"
         
-        # 步骤3: 从API获取（仅在前两级缓存失效时调用，确保准确性）
+        # 步骤2: 从API获取（字典缓存失效时调用）
         nickname = await self._fetch_and_cache_from_api(event, group_id, user_id)
         if nickname:
             return nickname
         
-        # 步骤4: 返回默认昵称
+        # 步骤3: 返回默认昵称
         return f"用户{user_id}"
     
-    @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
-    async def _get_from_nickname_cache(self, user_id: str) -> Optional[str]:
-        """从昵称缓存获取昵称"""
-        nickname_cache_key = f"nickname_{user_id}"
-        cached_nickname = self.user_nickname_cache.get(nickname_cache_key)
-        
-        # 如果缓存存在但TTL即将过期，标记为需要刷新（由上层逻辑处理）
-        if cached_nickname:
-            # TTL即将过期的用户可以在下次使用时自动刷新
-            return cached_nickname
-        
-        # 缓存miss，返回None触发上层逻辑从其他源获取
-        return cached_nickname
-    
-    @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
-    async def _get_from_dict_cache(self, group_id: str, user_id: str) -> Optional[str]:
-        """从群成员字典缓存获取昵称"""
-        dict_cache_key = f"group_members_dict_{group_id}"
-        if dict_cache_key in self.group_members_dict_cache:
-            members_dict = self.group_members_dict_cache[dict_cache_key]
-            if user_id in members_dict:
-                member = members_dict[user_id]
-                display_name = self._get_display_name_from_member(member)
-                if display_name:
-                    # 缓存到昵称缓存
-                    nickname_cache_key = f"nickname_{user_id}"
-                    self.user_nickname_cache[nickname_cache_key] = display_name
-                    return display_name
-        return None
-    
     async def _fetch_and_cache_from_api(self, event: AstrMessageEvent, group_id: str, user_id: str) -> Optional[str]:
         """从API获取群成员信息并缓存"""
         try:
-            members_info = await self._fetch_group_members_from_api(event, group_id)
-            if members_info:
-                # 重建字典缓存
-                dict_cache_key = f"group_members_dict_{group_id}"
-                members_dict = {str(m.get("user_id", "")): m for m in members_info if m.get("user_id")}
-                self.group_members_dict_cache[dict_cache_key] = members_dict
-                
-                # 查找用户
-                if user_id in members_dict:
-                    member = members_dict[user_id]
-                    display_name = self._get_display_name_from_member(member)
-                    if display_name:
-                        # 缓存到昵称缓存
-                        nickname_cache_key = f"nickname_{user_id}"
-                        self.user_nickname_cache[nickname_cache_key] = display_name
-                        return display_name
+            # 主缓存已过期但仍有旧数据时，直接使用旧数据并在后台刷新，避免阻塞消息处理
+            members_dict = self.group_members_failover.get(group_id)
+            if members_dict is not None:
+                self._schedule_members_refresh(event, group_id)
+            else:
+                members_dict = await self._fetch_group_members_from_api(event, group_id)
+            if members_dict:
+                # 查找用户（显示名称已在API获取时计算好）
+                return members_dict.get(user_id)
         except (AttributeError, KeyError, TypeError) as e:
             self.logger.warning(f"获取群成员信息失败(数据格式错误): {e}")
         except (ConnectionError, TimeoutError, OSError) as e:
@@ -1068,20 +1345,6 @@ class MessageStatsPlugin(Star):
             self.logger.error(f"获取备用昵称失败: {e}")
             return f"用户{user_id}"
 
-    @exception_handler(ExceptionConfig(log_exception=True, reraise=False))
-    def clear_user_cache(self, user_id: str = None):
-        """清理用户缓存"""
-        if user_id:
-            # 清理特定用户的缓存
-            nickname_cache_key = f"nickname_{user_id}"
-            if nickname_cache_key in self.user_nickname_cache:
-                del self.user_nickname_cache[nickname_cache_key]
-        else:
-            # 清理所有用户缓存
-            self.user_nickname_cache.clear()
-        
-        self.logger.info(f"清理用户缓存: {user_id or '全部'}")
-    
     def _is_blocked_user(self, user_id: str) -> bool:
         """检查用户是否在屏蔽列表中
         
@@ -1091,46 +1354,109 @@ class MessageStatsPlugin(Star):
         Returns:
             bool: 如果用户在屏蔽列表中返回True，否则返回False
         """
+        blocked_user_ids = self._blocked_user_ids
+        return bool(blocked_user_ids) and str(user_id) in blocked_user_ids
+    
+    def _build_blocked_user_ids(self) -> frozenset:
+        """构建屏蔽用户ID集合（统一转换为字符串）
+        
+        在加载插件配置时调用一次，结果保存在 self._blocked_user_ids，
+        消息监听和排行榜筛选直接读取该属性；名单变化时排行榜筛选缓存随之清空。
+        
+        Returns:
+            frozenset: 屏蔽用户ID集合，未配置时为空集合
+        """
         if not hasattr(self, 'plugin_config') or not self.plugin_config:
-            return False
+            return frozenset()
         
         blocked_users = getattr(self.plugin_config, 'blocked_users', [])
-        if not blocked_users:
-            return False
+        return frozenset(map(str, blocked_users)) if blocked_users else frozenset()
+    
+    def _schedule_members_refresh(self, event: AstrMessageEvent, group_id: str):
+        """在后台刷新群成员缓存（同一群组已有请求进行中时不重复调度）
         
-        # 将用户ID转换为字符串进行比较
-        user_id_str = str(user_id)
+        Args:
+            event (AstrMessageEvent): 消息事件对象
+            group_id (str): 群组ID
+        """
+        if group_id in self._members_inflight:
+            return
+        task = asyncio.create_task(self._fetch_group_members_from_api(event, group_id))
+        # 保留任务引用，防止任务在完成前被垃圾回收
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _fetch_group_members_from_api(self, event: AstrMessageEvent, group_id: str) -> Optional[Dict[str, str]]:
+        """从API获取群成员
+        
+        同一群组的并发请求会合并为一次API调用，其余调用方等待同一结果，
+        避免缓存过期瞬间大量消息同时请求API。
         
-        # 检查是否在屏蔽列表中
-        return user_id_str in [str(uid) for uid in blocked_users]
+        Args:
+            event (AstrMessageEvent): 消息事件对象
+            group_id (str): 群组ID
+            
+        Returns:
+            Optional[Dict[str, str]]: 用户ID到显示名称的字典，获取失败时返回None
+        """
+        return await self._fetch_group_members(event.bot, group_id)
     
-    async def _get_group_members_cache(self, event: AstrMessageEvent, group_id: str) -> Optional[List[Dict[str, Any]]]:
-        """获取群成员缓存"""
-        cache_key = f"group_members_{group_id}"
+    async def _fetch_group_members(self, client, group_id: str) -> Optional[Dict[str, str]]:
+        """使用指定客户端获取群成员（合并同一群组的并发请求）
         
-        if cache_key in self.group_members_cache:
-            return self.group_members_cache[cache_key]
-        else:
-            # 缓存未命中,从API获取
-            return await self._fetch_group_members_from_api(event, group_id)
+        Args:
+            client: 平台客户端（需提供 api.call_action）
+            group_id (str): 群组ID
+            
+        Returns:
+            Optional[Dict[str, str]]: 用户ID到显示名称的字典，获取失败时返回None
+        """
+        inflight = self._members_inflight.get(group_id)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._members_inflight[group_id] = future
+        try:
+            members_dict = await self._request_group_members(client, group_id)
+            future.set_result(members_dict)
+            return members_dict
+        finally:
+            self._members_inflight.pop(group_id, None)
+            if not future.done():
+                future.set_result(None)
     
-    async def _fetch_group_members_from_api(self, event: AstrMessageEvent, group_id: str) -> Optional[List[Dict[str, Any]]]:
-        """从API获取群成员"""
-        client = event.bot
+    async def _request_group_members(self, client, group_id: str) -> Optional[Dict[str, str]]:
+        """调用API获取群成员列表并写入缓存
+        
+        获取群成员列表后一次性构建用户ID到显示名称（群名片优先，其次昵称）的字典并写入缓存，
+        之后所有昵称查找都是一次字典访问，无需重复构建或再判断名片/昵称。
+        
+        Args:
+            client: 平台客户端（需提供 api.call_action）
+            group_id (str): 群组ID
+            
+        Returns:
+            Optional[Dict[str, str]]: 用户ID到显示名称的字典，获取失败时返回None
+        """
         params = {"group_id": group_id}
         
         try:
             members_info = await client.api.call_action('get_group_member_list', **params)
             if members_info:
-                # 缓存群成员列表,设置合理的过期时间
-                cache_key = f"group_members_{group_id}"
-                self.group_members_cache[cache_key] = members_info
+                # 构建并缓存群成员字典（只缓存显示名称，不再另存原始成员信息）
+                members_dict = {
+                    str(m["user_id"]): m.get("card") or m.get("nickname") or f"用户{m['user_id']}"
+                    for m in members_info if m.get("user_id")
+                }
+                self.group_members_dict_cache[f"group_members_dict_{group_id}"] = members_dict
+                self.group_members_failover[group_id] = members_dict
                 
                 # 对于大群(成员数>500),记录警告
                 if len(members_info) > 500:
                     self.logger.warning(f"群 {group_id} 成员数较多({len(members_info)}),建议调整缓存策略")
                 
-                return members_info
+                return members_dict
         except (AttributeError, KeyError, TypeError) as e:
             self.logger.warning(f"获取群成员列表失败(数据格式错误): {e}")
         except (ConnectionError, TimeoutError, OSError) as e:
@@ -1142,9 +1468,35 @@ class MessageStatsPlugin(Star):
         except ValueError as e:
             self.logger.warning(f"获取群成员列表失败(数据格式错误): {e}")
         
-        return None
+        # API失败时使用故障转移缓存中的旧数据
+        members_dict = self.group_members_failover.get(group_id)
+        if members_dict is not None:
+            self.logger.info(f"群 {group_id} 成员获取失败，使用故障转移缓存")
+        return members_dict
 
     async def _get_group_name(self, event: AstrMessageEvent, group_id: str) -> str:
+        """获取群名称（带缓存）
+        
+        群名很少变化，成功获取的群名长期缓存；获取失败时默认名称只短期缓存，
+        避免频繁请求失败的API。缓存与定时推送共用，见 PluginCache.set_group_name。
+        
+        Args:
+            event (AstrMessageEvent): 消息事件对象
+            group_id (str): 群组ID
+            
+        Returns:
+            str: 群名称，获取失败时返回 "群{group_id}"
+        """
+        cache_manager = self.data_manager.cache_manager
+        group_name = cache_manager.get_group_name(group_id)
+        if group_name:
+            return group_name
+        
+        group_name = await self._fetch_group_name(event, group_id)
+        cache_manager.set_group_name(group_id, group_name)
+        return group_name
+    
+    async def _fetch_group_name(self, event: AstrMessageEvent, group_id: str) -> str:
         """获取群名称 - 改进版本"""
         try:
             # 首先尝试通过事件对象获取群组信息
@@ -1180,7 +1532,7 @@ class MessageStatsPlugin(Star):
             # 准备数据
             rank_data = await self._prepare_rank_data(event, rank_type)
             if rank_data is None:
-                yield event.plain_result("无法获取排行榜数据,请检查群组信息或稍后重试")
+                yield event.plain_result(_MSG['rank_data_unavailable'])
                 return
             
             group_id, current_user_id, filtered_data, config, title, group_info = rank_data
@@ -1195,22 +1547,22 @@ class MessageStatsPlugin(Star):
         
         except (IOError, OSError) as e:
             self.logger.error(f"文件操作失败: {e}")
-            yield event.plain_result("文件操作失败,请检查权限")
+            yield event.plain_result(_MSG['file_op_failed'])
         except (AttributeError, KeyError, TypeError) as e:
             self.logger.error(f"数据格式错误: {e}")
-            yield event.plain_result("数据格式错误,请联系管理员")
+            yield event.plain_result(_MSG['data_format_error'])
         except (ConnectionError, TimeoutError) as e:
             self.logger.error(f"网络请求失败: {e}")
-            yield event.plain_result("网络请求失败,请稍后重试")
+            yield event.plain_result(_MSG['network_failed'])
         except ImportError as e:
             self.logger.error(f"导入错误: {e}")
-            yield event.plain_result("系统错误,请联系管理员")
+            yield event.plain_result(_MSG['system_error'])
         except RuntimeError as e:
             self.logger.error(f"运行时错误: {e}")
-            yield event.plain_result("系统错误,请联系管理员")
+            yield event.plain_result(_MSG['system_error'])
         except ValueError as e:
             self.logger.error(f"数据格式错误: {e}")
-            yield event.plain_result("数据格式错误,请联系管理员")
+            yield event.plain_result(_MSG['data_format_error'])
     
     async def _prepare_rank_data(self, event: AstrMessageEvent, rank_type: RankType):
         """准备排行榜数据"""
@@ -1227,6 +1579,9 @@ class MessageStatsPlugin(Star):
         group_id = str(group_id)
         current_user_id = str(current_user_id)
         
+        # 先写入尚未落盘的发言计数，保证排行榜数据是最新的
+        await self._flush_pending_counts()
+        
         # 获取群组数据
         group_data = await self.data_manager.get_group_data(group_id)
         
@@ -1236,20 +1591,20 @@ class MessageStatsPlugin(Star):
         # 显示排行榜前强制刷新昵称缓存，确保昵称准确性
         await self._refresh_nickname_cache_for_ranking(event, group_id, group_data)
         
-        # 根据类型筛选数据并获取排序值
-        filtered_data_with_values = await self._filter_data_by_rank_type(group_data, rank_type)
+        # 当前时间只取一次，筛选和标题共用同一个时间点
+        now = datetime.now()
+        
+        # 根据类型筛选数据（每个用户都带有display_total，结果已按发言数降序排列）
+        filtered_data = await self._filter_data_by_rank_type(group_id, group_data, rank_type, now)
         
-        if not filtered_data_with_values:
+        if not filtered_data:
             return None
         
-        # 对数据进行排序
-        filtered_data = sorted(filtered_data_with_values, key=lambda x: x[1], reverse=True)
-        
         # 获取配置
         config = self.plugin_config
         
         # 生成标题
-        title = self._generate_title(rank_type)
+        title = self._generate_title(rank_type, now)
         
         # 创建群组信息
         group_info = GroupInfo(group_id=group_id)
@@ -1263,61 +1618,48 @@ class MessageStatsPlugin(Star):
     async def _refresh_nickname_cache_for_ranking(self, event: AstrMessageEvent, group_id: str, group_data):
         """排行榜显示前强制刷新昵称缓存，确保显示最新昵称"""
         try:
-            # 获取最新群成员信息
-            members_info = await self._fetch_group_members_from_api(event, group_id)
-            if not members_info:
+            # 获取最新群成员信息（用户ID到显示名称的字典）
+            members_dict = await self._fetch_group_members_from_api(event, group_id)
+            if not members_dict:
                 return
             
-            # 重建群成员字典缓存
-            dict_cache_key = f"group_members_dict_{group_id}"
-            members_dict = {str(m.get("user_id", "")): m for m in members_info if m.get("user_id")}
-            self.group_members_dict_cache[dict_cache_key] = members_dict
-            
             # 更新用户数据中的昵称
             updated_count = 0
             for user in group_data:
                 user_id = user.user_id
-                if user_id in members_dict:
-                    member = members_dict[user_id]
-                    display_name = self._get_display_name_from_member(member)
-                    if display_name and user.nickname != display_name:
-                        # 更新昵称并同步到昵称缓存
-                        old_nickname = user.nickname
-                        user.nickname = display_name
-                        updated_count += 1
-                        
-                        # 同时更新昵称缓存
-                        nickname_cache_key = f"nickname_{user_id}"
-                        self.user_nickname_cache[nickname_cache_key] = display_name
-                        
-                        if self.plugin_config.detailed_logging_enabled:
-                            self.logger.debug(f"排行榜刷新昵称缓存: {old_nickname} → {display_name}")
+                display_name = members_dict.get(user_id)
+                if display_name and user.nickname != display_name:
+                    old_nickname = user.nickname
+                    user.nickname = display_name
+                    updated_count += 1
+                    
+                    if self.plugin_config.detailed_logging_enabled:
+                        self.logger.debug(f"排行榜刷新昵称缓存: {old_nickname} → {display_name}")
             
             # 保存更新后的数据
             if updated_count > 0:
                 await self.data_manager.save_group_data(group_id, group_data)
+                self._invalidate_rank_filter_cache({group_id})
                 if self.plugin_config.detailed_logging_enabled:
                     self.logger.info(f"排行榜显示前更新了 {updated_count} 个用户的昵称缓存")
             
         except Exception as e:
             self.logger.warning(f"排行榜前刷新昵称缓存失败: {e}")
 
-    async def _render_rank_as_image(self, event: AstrMessageEvent, filtered_data: List[tuple], 
+    async def _render_rank_as_image(self, event: AstrMessageEvent, filtered_data: List[RankEntry], 
                                   group_info: GroupInfo, title: str, current_user_id: str, config: PluginConfig):
         """渲染排行榜为图片模式"""
         temp_path = None
         try:
-            # 提取用户数据用于图片生成，并应用人数限制
-            # 先限制数量，再提取用户数据
-            limited_data = filtered_data[:config.rand]
-            users_for_image = []
-            
-            # 为用户数据设置display_total属性，确保图片生成器使用正确的数据
-            # 修复：直接命令版排行榜图片显示错误数据的问题
-            for user_data, count in limited_data:
-                # 设置display_total属性（时间段内的发言数）
-                user_data.display_total = count
-                users_for_image.append(user_data)
+            # 筛选结果已按时间段发言数降序排列，直接切片取前N名
+            users_for_image = filtered_data[:config.rand]
+            
+            # 榜单内容未变化时直接复用已渲染的图片
+            cache_key = self._rank_image_cache_key(users_for_image, group_info, title, current_user_id)
+            cached_path = self.rank_image_cache.get(cache_key)
+            if cached_path and await aiofiles.os.path.exists(cached_path):
+                yield event.image_result(str(cached_path))
+                return
             
             # 使用图片生成器
             temp_path = await self.image_generator.generate_rank_image(
@@ -1326,7 +1668,11 @@ class MessageStatsPlugin(Star):
             
             # 检查图片文件是否存在
             if await aiofiles.os.path.exists(temp_path):
-                yield event.image_result(str(temp_path))
+                # 缓存图片路径，之后由缓存负责清理文件
+                image_path = str(temp_path)
+                await self._cache_rank_image(cache_key, image_path)
+                temp_path = None
+                yield event.image_result(image_path)
             else:
                 # 回退到文字模式
                 text_msg = self._generate_text_message(filtered_data, group_info, title, config)
@@ -1360,187 +1706,144 @@ class MessageStatsPlugin(Star):
                 except OSError as e:
                     self.logger.warning(f"清理临时图片文件失败: {temp_path}, 错误: {e}")
     
-    async def _render_rank_as_text(self, event: AstrMessageEvent, filtered_data: List[tuple], 
-                                 group_info: GroupInfo, title: str, config: PluginConfig):
-        """渲染排行榜为文字模式"""
-        text_msg = self._generate_text_message(filtered_data, group_info, title, config)
-        yield event.plain_result(text_msg)
-    
-    @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
-    def _get_time_period_for_rank_type(self, rank_type: RankType) -> tuple:
-        """获取排行榜类型对应的时间段
+    def _rank_image_cache_key(self, top_users: List[RankEntry], group_info: GroupInfo,
+                              title: str, current_user_id: str) -> tuple:
+        """生成排行榜图片缓存键
+        
+        标题已包含榜单类型和日期，榜单数据哈希覆盖上榜用户、昵称和发言数，
+        任一变化都会生成新的缓存键。
         
         Args:
-            rank_type (RankType): 排行榜类型
+            top_users (List[RankEntry]): 已按人数限制截取的上榜用户
+            group_info (GroupInfo): 群组信息
+            title (str): 排行榜标题
+            current_user_id (str): 当前查询用户ID（图片中会高亮显示）
             
         Returns:
-            tuple: (start_date, end_date, period_name)，如果不需要时间段过滤则返回(None, None, None)
+            tuple: 缓存键
         """
-        current_date = datetime.now().date()
-        
-        if rank_type == RankType.TOTAL:
-            return None, None, "total"
-        elif rank_type == RankType.DAILY:
-            return current_date, current_date, "daily"
-        elif rank_type == RankType.WEEKLY:
-            # 获取本周开始日期(周一)
-            days_since_monday = current_date.weekday()
-            week_start = current_date - timedelta(days=days_since_monday)
-            return week_start, current_date, "weekly"
-        elif rank_type == RankType.MONTHLY:
-            # 获取本月开始日期
-            month_start = current_date.replace(day=1)
-            return month_start, current_date, "monthly"
-        else:
-            return None, None, "unknown"
+        data_hash = hash(tuple((user.user_id, user.nickname, user.display_total) for user in top_users))
+        return (group_info.group_id, title, group_info.group_name, current_user_id, data_hash)
     
-    async def _filter_data_by_rank_type(self, group_data: List[UserData], rank_type: RankType) -> List[tuple]:
-        """根据排行榜类型筛选数据并计算时间段内的发言次数 - 性能优化版本"""
-        start_date, end_date, period_name = self._get_time_period_for_rank_type(rank_type)
+    async def _cache_rank_image(self, cache_key: tuple, image_path: str):
+        """缓存排行榜图片路径，并删除过期或被淘汰的图片文件
         
-        if rank_type == RankType.TOTAL:
-            # 总榜：返回每个用户及其总发言数的元组，但过滤掉从未发言的用户和屏蔽用户
-            return [(user, user.message_count) for user in group_data 
-                   if user.message_count > 0 and not self._is_blocked_user(user.user_id)]
+        Args:
+            cache_key (tuple): 缓存键
+            image_path (str): 图片文件路径
+        """
+        # 删除已过期的图片文件
+        stale_paths = [path for _, path in self.rank_image_cache.expire()]
         
-        # 时间段过滤：优化版本，使用预聚合策略减少双重循环
-        # 策略：如果时间段较短（日榜），直接计算；如果时间段较长（周榜/月榜），使用缓存
+        # 缓存已满时淘汰最早的条目
+        old_path = self.rank_image_cache.get(cache_key)
+        if old_path is None and len(self.rank_image_cache) >= self.rank_image_cache.maxsize:
+            stale_paths.append(self.rank_image_cache.popitem()[1])
+        elif old_path is not None and old_path != image_path:
+            stale_paths.append(old_path)
         
-        # 对于日榜，直接计算（因为时间段短，性能影响小）
-        if rank_type == RankType.DAILY:
-            return self._calculate_daily_rank(group_data, start_date, end_date)
+        self.rank_image_cache[cache_key] = image_path
         
-        # 对于周榜和月榜，使用优化策略（现在是异步方法）
-        elif rank_type in [RankType.WEEKLY, RankType.MONTHLY]:
-            return await self._calculate_period_rank_optimized(group_data, start_date, end_date)
+        for path in stale_paths:
+            await self._remove_rank_image_file(path)
+    
+    async def _clear_rank_image_cache(self):
+        """清除排行榜图片缓存并删除对应的图片文件
         
-        return []
+        已过期但尚未被淘汰的条目不会出现在缓存的迭代结果中，
+        先通过 expire() 取出它们的路径，避免这些图片文件残留。
+        """
+        paths = [path for _, path in self.rank_image_cache.expire()]
+        paths.extend(self.rank_image_cache.values())
+        self.rank_image_cache.clear()
+        for path in paths:
+            if path:
+                await self._remove_rank_image_file(path)
     
-    @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
-    def _calculate_daily_rank(self, group_data: List[UserData], start_date, end_date) -> List[tuple]:
-        """计算日榜（直接计算策略）"""
-        filtered_users = []
-        for user in group_data:
-            # 过滤屏蔽用户
-            if self._is_blocked_user(user.user_id):
-                continue
-                
-            if not user.history:
-                continue
-            
-            # 计算指定时间段的发言次数
-            period_count = user.get_message_count_in_period(start_date, end_date)
-            if period_count > 0:
-                filtered_users.append((user, period_count))
+    async def _remove_rank_image_file(self, path: str):
+        """删除排行榜图片文件，文件不存在时忽略
         
-        return filtered_users
+        Args:
+            path (str): 图片文件路径
+        """
+        try:
+            if await aiofiles.os.path.exists(path):
+                await aiofiles.os.unlink(path)
+        except OSError as e:
+            self.logger.warning(f"清理排行榜图片文件失败: {path}, 错误: {e}")
     
-    async def _calculate_period_rank_optimized(self, group_data: List[UserData], start_date, end_date) -> List[tuple]:
-        """计算周榜/月榜（优化策略）"""
-        # 优化策略：先筛选出有历史记录的用户，然后批量计算
-        active_users = [user for user in group_data if user.history]
+    async def _render_rank_as_text(self, event: AstrMessageEvent, filtered_data: List[RankEntry], 
+                                 group_info: GroupInfo, title: str, config: PluginConfig):
+        """渲染排行榜为文字模式"""
+        text_msg = self._generate_text_message(filtered_data, group_info, title, config)
+        yield event.plain_result(text_msg)
+    
+    async def _filter_data_by_rank_type(self, group_id: str, group_data: List[UserData], rank_type: RankType, now: datetime) -> List[RankEntry]:
+        """根据排行榜类型筛选数据并计算时间段内的发言次数
+        
+        日榜/周榜/月榜直接读取 UserData 上预聚合的周期计数，无需遍历每个用户的历史记录。
+        返回轻量的 RankEntry 列表，display_total 为对应时间段的发言数，
+        不复制发言历史，也不会修改缓存中共享的用户对象。结果按 (群组ID, 排行榜类型, 日期) 缓存，
+        同一天内的重复查询直接返回缓存列表，数据写入或清除时失效。
+        缓存前按 display_total 降序排好，命中缓存时渲染只需切片取前N名。
         
-        if not active_users:
+        Args:
+            group_id (str): 群组ID
+            group_data (List[UserData]): 群组用户数据
+            rank_type (RankType): 排行榜类型
+            now (datetime): 当前时间，由调用方取一次后传入
+            
+        Returns:
+            List[RankEntry]: 按时间段发言数降序排列的排行榜条目列表，已过滤未发言用户和屏蔽用户
+        """
+        if rank_type not in (RankType.TOTAL, RankType.DAILY, RankType.WEEKLY, RankType.MONTHLY):
             return []
         
-        # 批量计算，减少函数调用开销
+        current_date = now.date()
+        cache_key = (group_id, rank_type, current_date)
+        cached = self.rank_filter_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # 屏蔽列表在循环外取一次，循环内只做集合查找和直接属性访问
+        blocked_user_ids = self._blocked_user_ids
         filtered_users = []
-        for user in active_users:
+        # 循环内用到的全局名和绑定方法先取到局部变量
+        append = filtered_users.append
+        entry = RankEntry
+        for user in group_data:
             # 过滤屏蔽用户
-            if self._is_blocked_user(user.user_id):
+            if user.user_id in blocked_user_ids:
                 continue
-                
-            # 使用更高效的计算方法（现在是异步方法）
-            period_count = await self._count_messages_in_period_fast(user.history, start_date, end_date)
+            
+            period_count = user.get_period_count(rank_type, current_date)
             if period_count > 0:
-                filtered_users.append((user, period_count))
+                append(entry(user.user_id, user.nickname, user.message_count, period_count, user.last_date))
         
+        # 只在缓存未命中时排序一次，之后同一天的查询都复用已排序的列表
+        filtered_users.sort(key=DISPLAY_TOTAL_KEY, reverse=True)
+        self.rank_filter_cache[cache_key] = filtered_users
         return filtered_users
     
-    async def _count_messages_in_period_fast(self, history: List, start_date, end_date) -> int:
-        """快速计算指定时间段内的消息数量（优化版本）
+    def _invalidate_rank_filter_cache(self, group_ids: set):
+        """使指定群组的排行榜筛选结果缓存失效
         
-        如果历史记录未排序，将自动排序后进行计算。
-        对于已排序的记录，使用高效的早停算法。
+        Args:
+            group_ids (set): 数据发生变化的群组ID集合
         """
-        # 如果历史记录为空，直接返回0
-        if not history:
-            return 0
-        
-        # 完整遍历检查列表是否真正有序，避免采样检查的误判问题
-        is_sorted = True
-        if len(history) > 1:
-            try:
-                # 完整遍历检查：确保列表真正有序（优化版本）
-                for current_item, next_item in zip(history[:-1], history[1:]):
-                    current_date = current_item.to_date() if hasattr(current_item, 'to_date') else current_item
-                    next_date = next_item.to_date() if hasattr(next_item, 'to_date') else next_item
-                    if current_date > next_date:
-                        is_sorted = False
-                        break
-                        
-            except (AttributeError, TypeError):
-                # 如果无法比较，假设未排序
-                is_sorted = False
-        
-        # 如果检测到列表确实有序，使用早停算法
-        if is_sorted:
-            count = 0
-            for hist_date in history:
-                # 转换为日期对象
-                hist_date_obj = hist_date.to_date() if hasattr(hist_date, 'to_date') else hist_date
-                
-                # 检查是否在指定时间段内
-                if hist_date_obj < start_date:
-                    continue
-                if hist_date_obj > end_date:
-                    # 已排序，可以提前跳出循环
-                    break
-                count += 1
-            
-            return count
-        
-        # 如果检测到列表无序，直接使用无序版本计算
-        else:
-            return self._count_messages_in_period_unordered(history, start_date, end_date)
+        for key in [key for key in list(self.rank_filter_cache.keys()) if key[0] in group_ids]:
+            self.rank_filter_cache.pop(key, None)
     
     @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
-    def _count_messages_in_period_unordered(self, history: List, start_date, end_date) -> int:
-        """计算指定时间段内的消息数量（适用于未排序的历史记录）"""
-        if not history:
-            return 0
-        
-        count = 0
-        for hist_date in history:
-            hist_date_obj = hist_date.to_date() if hasattr(hist_date, 'to_date') else hist_date
-            if start_date <= hist_date_obj <= end_date:
-                count += 1
-        
-        return count
-    
-    @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
-    def _generate_title(self, rank_type: RankType) -> str:
+    def _generate_title(self, rank_type: RankType, now: datetime) -> str:
         """生成标题"""
-        now = datetime.now()
-        
-        if rank_type == RankType.TOTAL:
-            return "总发言排行榜"
-        elif rank_type == RankType.DAILY:
-            return f"今日[{now.year}年{now.month}月{now.day}日]发言榜单"
-        elif rank_type == RankType.WEEKLY:
-            # 计算周数
-            week_num = now.isocalendar().week
-            return f"本周[{now.year}年{now.month}月第{week_num}周]发言榜单"
-        elif rank_type == RankType.MONTHLY:
-            return f"本月[{now.year}年{now.month}月]发言榜单"
-        else:
-            return "发言榜单"
+        return format_rank_title(rank_type, now)
     
-    def _generate_text_message(self, users_with_values: List[tuple], group_info: GroupInfo, title: str, config: PluginConfig) -> str:
+    def _generate_text_message(self, users_with_values: List[RankEntry], group_info: GroupInfo, title: str, config: PluginConfig) -> str:
         """生成文字消息
         
         Args:
-            users_with_values: 包含(UserData, sort_value)元组的列表
+            users_with_values: 排行榜条目列表（display_total 为时间段内发言数）
             group_info: 群组信息
             title: 排行榜标题
             config: 插件配置
@@ -1549,18 +1852,22 @@ class MessageStatsPlugin(Star):
             str: 格式化的文字消息
         """
         # 计算时间段内的总发言数
-        total_messages = sum(sort_value for _, sort_value in users_with_values)
+        total_messages = sum(map(DISPLAY_TOTAL_KEY, users_with_values))
         
-        # 数据已经在_show_rank中排好序，直接使用并限制数量
+        # 筛选结果已按时间段发言数降序排列，直接切片取前N名
         top_users = users_with_values[:config.rand]
         
-        msg = [f"{title}\n发言总数: {total_messages}\n━━━━━━━━━━━━━━\n"]
-        
-        for i, (user, user_messages) in enumerate(top_users):
-            # 使用时间段内的发言数计算百分比
-            percentage = ((user_messages / total_messages) * 100) if total_messages > 0 else 0
-            msg.append(f"第{i + 1}名:{user.nickname}·{user_messages}次(占比{percentage:.2f}%)\n")
-        
+        header = f"{title}\n发言总数: {total_messages}\n━━━━━━━━━━━━━━\n"
+        if not total_messages:
+            return header
+        
+        # 百分比系数只计算一次，每行一次乘法；每行一个f-string，最后一次性拼接
+        scale = 100.0 / total_messages
+        msg = [header]
+        msg.extend(
+            f"第{rank}名:{user.nickname}·{user.display_total}次(占比{user.display_total * scale:.2f}%)\n"
+            for rank, user in enumerate(top_users, 1)
+        )
         return ''.join(msg)
     
     # ========== 定时功能管理命令 ==========
@@ -1615,49 +1922,50 @@ class MessageStatsPlugin(Star):
             
         except (IOError, OSError, KeyError) as e:
             self.logger.error(f"获取定时状态失败: {e}")
-            yield event.plain_result("获取定时状态失败，请稍后重试！")
+            yield event.plain_result(_MSG['timer_status_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"获取定时状态失败(运行时错误): {e}")
-            yield event.plain_result("获取定时状态失败，请稍后重试！")
+            yield event.plain_result(_MSG['timer_status_failed'])
     
     @filter.command("手动推送发言榜")
     async def manual_push(self, event: AstrMessageEvent):
         """手动推送排行榜"""
         try:
             if not self.timer_manager:
-                yield event.plain_result("定时管理器未初始化，无法执行手动推送！")
+                yield event.plain_result(_MSG['manual_push_no_manager'])
                 return
             
             # 检查TimerManager是否有有效的context
             if not hasattr(self.timer_manager, 'context') or not self.timer_manager.context:
-                yield event.plain_result("❌ 定时管理器未完全初始化！\n\n💡 可能的原因：\n• 插件初始化过程中出现异常\n• 上下文信息缺失\n\n🔧 解决方案：\n• 重启机器人或重新加载插件\n• 检查插件配置是否正确")
+                yield event.plain_result(_MSG['manual_push_no_context'])
                 return
             
             # 使用当前转换的配置而不是从文件读取
             config = self.plugin_config
             
             if not config.timer_target_groups:
-                yield event.plain_result("未设置目标群组，请先使用 #设置定时群组 设置目标群组！")
+                yield event.plain_result(_MSG['manual_push_no_groups'])
                 return
             
-            # 执行手动推送
-            yield event.plain_result("正在执行手动推送，请稍候...")
+            # 执行手动推送（先写入尚未落盘的发言计数）
+            yield event.plain_result(_MSG['manual_push_running'])
+            await self._flush_pending_counts()
             
             success = await self.timer_manager.manual_push(config)
             
             if success:
-                yield event.plain_result("✅ 手动推送执行成功！")
+                yield event.plain_result(_MSG['manual_push_ok'])
             else:
-                yield event.plain_result("❌ 手动推送执行失败！\n\n💡 可能的原因：\n• 缺少 unified_msg_origin\n• 群组权限不足\n\n🔧 解决方案：\n• 在群组中发送任意消息以收集 unified_msg_origin\n• 检查机器人是否有群组发言权限")
+                yield event.plain_result(_MSG['manual_push_failed'])
             
         except (AttributeError, TypeError) as e:
             self.logger.error(f"处理手动推送请求失败: {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
         except (RuntimeError, ValueError, KeyError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理手动推送请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     @filter.command("设置发言榜定时时间")
     async def set_timer_time(self, event: AstrMessageEvent):
@@ -1667,23 +1975,25 @@ class MessageStatsPlugin(Star):
         """
         try:
             # 获取参数
-            args = event.message_str.split()[1:] if hasattr(event, 'message_str') else []
+            # 只拆出指令名和第一个参数，不切分整条消息
+            parts = event.message_str.split(maxsplit=2) if hasattr(event, 'message_str') else []
+            arg0 = parts[1] if len(parts) > 1 else None
             
-            if not args:
-                yield event.plain_result("请指定时间！用法:#设置定时时间 16:12")
+            if arg0 is None:
+                yield event.plain_result(_MSG['need_time_arg'])
                 return
             
-            time_str = args[0]
+            time_str = arg0
             
             # 验证时间格式
             if not self._validate_time_format(time_str):
-                yield event.plain_result("时间格式错误！请使用 HH:MM 格式，例如：16:12")
+                yield event.plain_result(_MSG['time_format_hint'])
                 return
             
             # 获取当前群组ID
             group_id = event.get_group_id()
             if not group_id:
-                yield event.plain_result("无法获取当前群组ID！")
+                yield event.plain_result(_MSG['no_current_group'])
                 return
             
             # 获取当前配置（使用转换后的配置）
@@ -1701,37 +2011,20 @@ class MessageStatsPlugin(Star):
             rank_type_text = self._get_rank_type_text(config.timer_rank_type)
             if self.timer_manager:
                 success = await self.timer_manager.update_config(config, self.group_unified_msg_origins)
-                if success:
-                    yield event.plain_result(
-                        f"✅ 定时推送设置完成！\n"
-                        f"• 推送时间：{time_str}\n"
-                        f"• 目标群组：{group_id}\n"
-                        f"• 排行榜类型：{rank_type_text}\n"
-                        f"• 状态：已启用\n\n"
-                        f"💡 提示：如果推送失败，请在群组中发送任意消息以收集unified_msg_origin"
-                    )
-                else:
-                    yield event.plain_result(
-                        f"⚠️ 定时推送设置部分完成！\n"
-                        f"• 推送时间：{time_str}\n"
-                        f"• 目标群组：{group_id}\n"
-                        f"• 排行榜类型：{rank_type_text}\n"
-                        f"• 状态：配置保存成功，但定时任务启动失败\n\n"
-                        f"💡 提示：如果推送失败，请在群组中发送任意消息以收集unified_msg_origin"
-                    )
+                yield event.plain_result(self._timer_result_msg(success, time_str, group_id, rank_type_text))
             else:
-                yield event.plain_result(f"✅ 定时推送配置已保存！\n• 推送时间：{time_str}\n• 目标群组：{group_id}\n• 排行榜类型：{rank_type_text}\n• 状态：配置保存成功\n\n💡 提示：定时管理器未初始化，请检查插件配置")
+                yield event.plain_result(_MSG['timer_saved_no_manager'].format(time=time_str, group=group_id, rank=rank_type_text))
             
         except ValueError as e:
             self.logger.error(f"处理设置定时时间请求失败: {e}")
-            yield event.plain_result("时间格式错误，请使用 HH:MM 格式！")
+            yield event.plain_result(_MSG['time_format_error'])
         except (IOError, OSError) as e:
             self.logger.error(f"处理设置定时时间请求失败: {e}")
-            yield event.plain_result("保存配置失败，请稍后重试！")
+            yield event.plain_result(_MSG['save_config_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理设置定时时间请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     @filter.command("设置发言榜定时群组")
     async def set_timer_groups(self, event: AstrMessageEvent):
@@ -1741,17 +2034,16 @@ class MessageStatsPlugin(Star):
             args = event.message_str.split()[1:] if hasattr(event, 'message_str') else []
             
             if not args:
-                yield event.plain_result("请指定群组ID！用法:#设置发言榜定时群组 123456789 987654321")
+                yield event.plain_result(_MSG['need_groups_arg'])
                 return
             
             # 验证群组ID
             valid_groups = []
             for group_id in args:
-                if group_id.isdigit() and len(group_id) >= 5:
-                    valid_groups.append(group_id)
-                else:
-                    yield event.plain_result(f"群组ID格式错误: {group_id}，必须是5位以上数字")
+                if not _GID_RE.fullmatch(group_id):
+                    yield event.plain_result(_MSG['group_id_format'].format(group=group_id))
                     return
+                valid_groups.append(group_id)
             
             # 获取当前配置（使用转换后的配置）
             config = self.plugin_config
@@ -1761,19 +2053,19 @@ class MessageStatsPlugin(Star):
             if self.timer_manager and config.timer_enabled:
                 await self.timer_manager.update_config(config, self.group_unified_msg_origins)
             
-            groups_text = "\n".join([f"   • {group_id}" for group_id in valid_groups])
-            yield event.plain_result(f"✅ 定时推送目标群组已设置：\n{groups_text}")
+            groups_text = "\n".join(f"   • {group_id}" for group_id in valid_groups)
+            yield event.plain_result(_MSG['groups_set'].format(groups=groups_text))
             
         except ValueError as e:
             self.logger.error(f"处理设置定时群组请求失败: {e}")
-            yield event.plain_result("群组ID格式错误，请输入有效的群组ID！")
+            yield event.plain_result(_MSG['group_id_invalid'])
         except (IOError, OSError) as e:
             self.logger.error(f"处理设置定时群组请求失败: {e}")
-            yield event.plain_result("保存配置失败，请稍后重试！")
+            yield event.plain_result(_MSG['save_config_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理设置定时群组请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     @filter.command("删除发言榜定时群组")
     async def remove_timer_groups(self, event: AstrMessageEvent):
@@ -1794,22 +2086,16 @@ class MessageStatsPlugin(Star):
                 if self.timer_manager and config.timer_enabled:
                     await self.timer_manager.update_config(config, self.group_unified_msg_origins)
                 
-                yield event.plain_result("✅ 已清空所有定时推送目标群组")
+                yield event.plain_result(_MSG['groups_cleared'])
                 return
             
-            # 删除指定群组
-            groups_to_remove = []
-            invalid_groups = []
-            
+            # 删除指定群组（单次遍历，遇到非法ID立即返回；dict保持输入顺序并去重）
+            groups_to_remove = {}
             for group_id in args:
-                if group_id.isdigit() and len(group_id) >= 5:
-                    groups_to_remove.append(group_id)
-                else:
-                    invalid_groups.append(group_id)
-            
-            if invalid_groups:
-                yield event.plain_result(f"群组ID格式错误: {', '.join(invalid_groups)}，必须是5位以上数字")
-                return
+                if not _GID_RE.fullmatch(group_id):
+                    yield event.plain_result(_MSG['group_id_format'].format(group=group_id))
+                    return
+                groups_to_remove[group_id] = None
             
             # 从当前群组列表中移除指定群组
             remaining_groups = [group for group in current_groups if group not in groups_to_remove]
@@ -1823,22 +2109,22 @@ class MessageStatsPlugin(Star):
                 await self.timer_manager.update_config(config, self.group_unified_msg_origins)
             
             if groups_to_remove:
-                removed_text = "\n".join([f"   • {group_id}" for group_id in groups_to_remove])
-                remaining_text = "\n".join([f"   • {group_id}" for group_id in remaining_groups]) if remaining_groups else "   无"
-                yield event.plain_result(f"✅ 已删除定时推送目标群组：\n{removed_text}\n\n📋 剩余群组：\n{remaining_text}")
+                removed_text = "\n".join(f"   • {group_id}" for group_id in groups_to_remove)
+                remaining_text = "\n".join(f"   • {group_id}" for group_id in remaining_groups) if remaining_groups else "   无"
+                yield event.plain_result(_MSG['groups_removed'].format(removed=removed_text, remaining=remaining_text))
             else:
-                yield event.plain_result("⚠️ 未找到要删除的群组")
+                yield event.plain_result(_MSG['groups_not_found'])
             
         except ValueError as e:
             self.logger.error(f"处理删除定时群组请求失败: {e}")
-            yield event.plain_result("群组ID格式错误，请输入有效的群组ID！")
+            yield event.plain_result(_MSG['group_id_invalid'])
         except (IOError, OSError) as e:
             self.logger.error(f"处理删除定时群组请求失败: {e}")
-            yield event.plain_result("保存配置失败，请稍后重试！")
+            yield event.plain_result(_MSG['save_config_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理删除定时群组请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     @filter.command("启用发言榜定时")
     async def enable_timer(self, event: AstrMessageEvent):
@@ -1849,7 +2135,7 @@ class MessageStatsPlugin(Star):
             
             # 检查配置
             if not config.timer_target_groups:
-                yield event.plain_result("请先设置目标群组！用法:#设置定时群组 群组ID")
+                yield event.plain_result(_MSG['need_groups_first'])
                 return
             
             # 启用定时功能
@@ -1859,24 +2145,24 @@ class MessageStatsPlugin(Star):
             if self.timer_manager:
                 # 检查TimerManager是否有有效的context
                 if not hasattr(self.timer_manager, 'context') or not self.timer_manager.context:
-                    yield event.plain_result("⚠️ 定时管理器未完全初始化！\n\n💡 可能的原因：\n• 插件初始化过程中出现异常\n• 上下文信息缺失\n\n🔧 解决方案：\n• 重启机器人或重新加载插件\n• 检查插件配置是否正确")
+                    yield event.plain_result(_MSG['timer_no_context'])
                     return
                 
                 success = await self.timer_manager.update_config(config, self.group_unified_msg_origins)
                 if success:
-                    yield event.plain_result("✅ 定时推送功能已启用！")
+                    yield event.plain_result(_MSG['timer_enabled'])
                 else:
-                    yield event.plain_result("⚠️ 定时推送功能启用失败，请检查配置！")
+                    yield event.plain_result(_MSG['timer_enable_failed'])
             else:
-                yield event.plain_result("⚠️ 定时管理器未初始化！")
+                yield event.plain_result(_MSG['timer_no_manager'])
             
         except (IOError, OSError) as e:
             self.logger.error(f"处理启用定时请求失败: {e}")
-            yield event.plain_result("保存配置失败，请稍后重试！")
+            yield event.plain_result(_MSG['save_config_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理启用定时请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     @filter.command("禁用发言榜定时")
     async def disable_timer(self, event: AstrMessageEvent):
@@ -1885,6 +2171,11 @@ class MessageStatsPlugin(Star):
             # 获取当前配置（使用转换后的配置）
             config = self.plugin_config
             
+            # 已处于禁用状态时无需再次停止定时任务
+            if not config.timer_enabled:
+                yield event.plain_result(_MSG['timer_already_disabled'])
+                return
+            
             # 禁用定时功能
             config.timer_enabled = False
             
@@ -1892,33 +2183,35 @@ class MessageStatsPlugin(Star):
             if self.timer_manager:
                 await self.timer_manager.stop_timer()
             
-            yield event.plain_result("✅ 定时推送功能已禁用！")
+            yield event.plain_result(_MSG['timer_disabled'])
             
         except (IOError, OSError) as e:
             self.logger.error(f"处理禁用定时请求失败: {e}")
-            yield event.plain_result("保存配置失败，请稍后重试！")
+            yield event.plain_result(_MSG['save_config_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理禁用定时请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     @filter.command("设置发言榜定时类型")
     async def set_timer_type(self, event: AstrMessageEvent):
         """设置定时推送的排行榜类型"""
         try:
             # 获取参数
-            args = event.message_str.split()[1:] if hasattr(event, 'message_str') else []
+            # 只拆出指令名和第一个参数，不切分整条消息
+            parts = event.message_str.split(maxsplit=2) if hasattr(event, 'message_str') else []
+            arg0 = parts[1] if len(parts) > 1 else None
             
-            if not args:
-                yield event.plain_result("请指定排行榜类型！用法:#设置定时类型 total/daily/week/month")
+            if arg0 is None:
+                yield event.plain_result(_MSG['need_type_arg'])
                 return
             
-            rank_type = args[0].lower()
+            rank_type = arg0.lower()
             
             # 验证排行榜类型
             valid_types = ['total', 'daily', 'week', 'weekly', 'month', 'monthly']
             if rank_type not in valid_types:
-                yield event.plain_result(f"排行榜类型错误！可用类型: {', '.join(valid_types)}")
+                yield event.plain_result(_MSG['timer_type_unknown'].format(types=', '.join(valid_types)))
                 return
             
             # 获取当前配置（使用转换后的配置）
@@ -1930,18 +2223,18 @@ class MessageStatsPlugin(Star):
                 await self.timer_manager.update_config(config, self.group_unified_msg_origins)
             
             type_text = self._get_rank_type_text(rank_type)
-            yield event.plain_result(f"✅ 定时推送排行榜类型已设置为 {type_text}！")
+            yield event.plain_result(_MSG['timer_type_set'].format(type=type_text))
             
         except ValueError as e:
             self.logger.error(f"处理设置定时类型请求失败: {e}")
-            yield event.plain_result("排行榜类型错误，请使用：total/daily/weekly/monthly")
+            yield event.plain_result(_MSG['timer_type_invalid'])
         except (IOError, OSError) as e:
             self.logger.error(f"处理设置定时类型请求失败: {e}")
-            yield event.plain_result("保存配置失败，请稍后重试！")
+            yield event.plain_result(_MSG['save_config_failed'])
         except (RuntimeError, AttributeError, ValueError, TypeError, ConnectionError, asyncio.TimeoutError) as e:
             # 修复：替换过于宽泛的Exception为具体异常类型
             self.logger.error(f"处理设置定时类型请求失败(运行时错误): {e}")
-            yield event.plain_result("处理请求失败，请稍后重试！")
+            yield event.plain_result(_MSG['request_failed'])
     
     # ========== 辅助方法 ==========
     
@@ -1959,23 +2252,23 @@ class MessageStatsPlugin(Star):
         try:
             if isinstance(exception, (KeyError, TypeError)):
                 self.logger.error(f"{operation_name}失败(数据格式错误): {exception}", exc_info=True)
-                event.plain_result(f"{operation_name}失败，请稍后重试")
+                event.plain_result(_MSG['op_failed'].format(op=operation_name))
                 return True
             elif isinstance(exception, (IOError, OSError, FileNotFoundError)):
                 self.logger.error(f"{operation_name}失败(文件操作错误): {exception}", exc_info=True)
-                event.plain_result(f"{operation_name}失败，请稍后重试")
+                event.plain_result(_MSG['op_failed'].format(op=operation_name))
                 return True
             elif isinstance(exception, ValueError):
                 self.logger.error(f"{operation_name}失败(参数错误): {exception}", exc_info=True)
-                event.plain_result(f"{operation_name}失败，请稍后重试")
+                event.plain_result(_MSG['op_failed'].format(op=operation_name))
                 return True
             elif isinstance(exception, RuntimeError):
                 self.logger.error(f"{operation_name}失败(运行时错误): {exception}", exc_info=True)
-                event.plain_result(f"{operation_name}失败，请稍后重试")
+                event.plain_result(_MSG['op_failed'].format(op=operation_name))
                 return True
             else:
                 self.logger.error(f"{operation_name}失败(未预期的错误类型 {type(exception).__name__}): {exception}", exc_info=True)
-                event.plain_result(f"{operation_name}失败，请稍后重试")
+                event.plain_result(_MSG['op_failed'].format(op=operation_name))
                 return True
         except (RuntimeError, AttributeError, ValueError, TypeError, KeyError) as handler_error:
             # 修复：替换过于宽泛的Exception为具体异常类型
@@ -2020,10 +2313,28 @@ class MessageStatsPlugin(Star):
             # 修复：替换过于宽泛的except:为具体异常类型
             return dt_str
     
+    def _timer_result_msg(self, ok: bool, time_str: str, group_id: str, rank_text: str) -> str:
+        """生成定时推送设置结果提示
+
+        Args:
+            ok: 定时任务是否启动成功
+            time_str: 推送时间
+            group_id: 目标群组ID
+            rank_text: 排行榜类型的中文描述
+
+        Returns:
+            str: 设置结果提示文本
+        """
+        emoji = "✅" if ok else "⚠️"
+        result = "完成" if ok else "部分完成"
+        status = "已启用" if ok else "配置保存成功，但定时任务启动失败"
+        return _MSG['timer_set_result'].format(
+            emoji=emoji, result=result, time=time_str, group=group_id, rank=rank_text, status=status
+        )
+
     @exception_handler(ExceptionConfig(log_exception=True, reraise=True))
     def _validate_time_format(self, time_str: str) -> bool:
         """验证时间格式"""
-        import re
         pattern = r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$'
         return bool(re.match(pattern, time_str))
     
@@ -3,56 +3,37 @@ HTML模板模块
 包含用于生成排行榜图片的HTML模板
 """
 
-import aiofiles
-import aiofiles.os
+import functools
 import logging
-from pathlib import Path
+import os
+import re
+import string
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 
 # 模板文件路径
-TEMPLATE_DIR = Path(__file__).parent
-RANK_TEMPLATE_PATH = TEMPLATE_DIR / "rank_template.html"
+# 模块加载时直接算出字符串路径，open/os.path 可直接使用，无需构造 Path 对象
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+RANK_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, "rank_template.html")
 
-async def get_rank_template() -> str:
-    """获取排行榜HTML模板"""
-    try:
-        if await aiofiles.os.path.exists(RANK_TEMPLATE_PATH):
-            async with aiofiles.open(RANK_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
-                return await f.read()
-        else:
-            # 返回默认模板
-            return get_default_template()
-    except (IOError, UnicodeDecodeError) as e:
-        logger.warning(f"读取模板文件失败: {e}")
-        return get_default_template()
-
-def get_default_template() -> str:
-    """获取默认HTML模板"""
-    return """
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>发言排行榜</title>
-    <style>
-        * {{
+# 默认模板样式，和HTML骨架分开维护，模块加载时只代入一次
+_DEFAULT_CSS = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: Arial, sans-serif;
             background-color: #f5f5f5;
             padding: 20px;
             margin: 0;
             line-height: 1.6;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 800px;
             margin: 0 auto;
             background-color: #ffffff;
@@ -60,33 +41,33 @@ def get_default_template() -> str:
             padding: 20px;
             box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
             overflow: hidden;
-        }}
+        }
         
-        .title {{
+        .title {
             text-align: center;
             color: #333333;
             margin-bottom: 20px;
             font-size: 24px;
             font-weight: bold;
-        }}
+        }
         
-        .user-item {{
+        .user-item {
             display: flex;
             align-items: center;
             padding: 10px;
             border-bottom: 1px solid #eeeeee;
             transition: background-color 0.3s ease;
-        }}
+        }
         
-        .user-item:hover {{
+        .user-item:hover {
             background-color: #f9f9f9;
-        }}
+        }
         
-        .user-item:last-child {{
+        .user-item:last-child {
             border-bottom: none;
-        }}
+        }
         
-        .rank {{
+        .rank {
             width: 40px;
             height: 40px;
             border-radius: 50%;
@@ -99,76 +80,159 @@ def get_default_template() -> str:
             font-weight: bold;
             font-size: 14px;
             flex-shrink: 0;
-        }}
+        }
         
-        .info {{
+        .info {
             flex: 1;
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .nickname {{
+        .nickname {
             font-weight: bold;
             color: #333333;
             font-size: 16px;
             margin-bottom: 2px;
-        }}
+        }
         
-        .count {{
+        .count {
             color: #666666;
             font-size: 14px;
             font-weight: 500;
-        }}
+        }
         
         /* 响应式设计 */
-        @media (max-width: 768px) {{
-            body {{
+        @media (max-width: 768px) {
+            body {
                 padding: 10px;
-            }}
+            }
             
-            .container {{
+            .container {
                 padding: 15px;
-            }}
+            }
             
-            .title {{
+            .title {
                 font-size: 20px;
-            }}
+            }
             
-            .user-item {{
+            .user-item {
                 padding: 8px;
-            }}
+            }
             
-            .rank {{
+            .rank {
                 width: 35px;
                 height: 35px;
                 font-size: 12px;
                 margin-right: 10px;
-            }}
+            }
             
-            .nickname {{
+            .nickname {
                 font-size: 14px;
-            }}
+            }
             
-            .count {{
+            .count {
                 font-size: 12px;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+# 默认HTML骨架（模板文件不存在或读取失败时使用）
+# 骨架内用 string.Template 占位符拼装，CSS中的花括号无需手工转义
+_HTML_SKELETON = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>发言排行榜</title>
+    <style>$css</style>
 </head>
 <body>
     <div class="container">
-        <h1 class="title">{title}</h1>
-        {user_items}
+        <h1 class="title">$title</h1>
+        $user_items
     </div>
 </body>
 </html>
 """
 
+
+
+def _minify_template(text: str) -> str:
+    """压缩模板中的空白和CSS注释，减少每次渲染传给浏览器的字节数
+    
+    Args:
+        text (str): 原始模板文本
+        
+    Returns:
+        str: 压缩后的模板文本，占位符保持不变
+    """
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.replace("} ", "}").replace(" {", "{").replace("{ ", "{").replace("; ", ";").replace(": ", ":").replace("> <", "><")
+
+
+# 模块加载时压缩并代入样式，生成与原先一致的 str.format 模板：
+# 样式中的花括号转义为 {{ }}，只留 {title} / {user_items} 供调用方 format 代入
+_DEFAULT_TEMPLATE = string.Template(_minify_template(_HTML_SKELETON)).substitute(
+    css=_minify_template(_DEFAULT_CSS).replace("{", "{{").replace("}", "}}"),
+    title="{title}",
+    user_items="{user_items}",
+)
+
+# 已加载的排行榜模板，首次读取后缓存，运行期间模板文件不会变化
+_cached_template = None
+
+
+def _load_template() -> str:
+    """同步读取模板文件，失败时返回默认模板
+    
+    模板只有几KB且每个进程只读一次，同步读取比提交到线程池的异步读取更快。
+    
+    Returns:
+        str: 模板文件内容或默认模板
+    """
+    try:
+        with open(RANK_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        # 返回默认模板
+        return get_default_template()
+    except (IsADirectoryError, PermissionError, IOError, UnicodeDecodeError) as e:
+        logger.warning(f"读取模板文件失败: {e}")
+        return get_default_template()
+
+
+async def get_rank_template() -> str:
+    """获取排行榜HTML模板（首次读取后缓存）
+    
+    保留异步接口以兼容调用方；读取过程中没有await，并发调用也只会读取一次。
+    """
+    global _cached_template
+    if _cached_template is None:
+        _cached_template = _load_template()
+    return _cached_template
+
+def clear_template_cache():
+    """清除已缓存的模板，下次获取时重新读取模板文件（开发调试时修改模板后使用）"""
+    global _cached_template
+    _cached_template = None
+
+@functools.lru_cache(maxsize=1)
+def get_default_template() -> str:
+    """获取默认HTML模板（str.format 格式，占位符为 {title} / {user_items}）"""
+    return _DEFAULT_TEMPLATE
+
 async def template_exists() -> bool:
-    """异步检查模板文件是否存在"""
+    """异步检查模板文件是否存在（已加载过模板文件时直接返回）
+    
+    只有一次stat，直接同步执行，不再为此加载aiofiles。
+    """
+    if _cached_template is not None and _cached_template is not _DEFAULT_TEMPLATE:
+        return True
     try:
-        return await aiofiles.os.path.exists(RANK_TEMPLATE_PATH)
+        return os.path.exists(RANK_TEMPLATE_PATH)
     except (OSError, PermissionError) as e:
         # 修复：使用具体的异常类型替代过于宽泛的Exception
         # OSError和PermissionError涵盖了文件检查操作可能遇到的具体错误
@@ -11,23 +11,50 @@
 - validators: 验证器
 """
 
-from .models import (
-    UserData, MessageDate, PluginConfig,
-    GroupInfo, RankData, RankType
-)
-from .file_utils import load_json_file, save_json_file
-from .date_utils import (
-    get_current_date, get_week_start, get_month_start,
-    is_same_week, is_same_month, get_date_range_days
-)
-from .data_manager import DataManager
-from .image_generator import ImageGenerator, ImageGenerationError
-from .validators import Validators, ValidationError
+import importlib
+
+# 导出名称到所在子模块的映射，首次访问时才导入对应子模块（PEP 562），
+# 只用到数据模型的调用方不会连带加载图片生成器等重量级依赖
+_LAZY_IMPORTS = {
+    # 数据模型
+    "UserData": ".models", "MessageDate": ".models", "PluginConfig": ".models",
+    "GroupInfo": ".models", "RankData": ".models", "RankType": ".models", "RankEntry": ".models",
+    
+    # 文件操作工具
+    "load_json_file": ".file_utils", "save_json_file": ".file_utils",
+    
+    # 日期时间工具
+    "get_current_date": ".date_utils", "get_week_start": ".date_utils",
+    "get_month_start": ".date_utils", "is_same_week": ".date_utils",
+    "is_same_month": ".date_utils", "get_date_range_days": ".date_utils",
+    
+    # 核心组件
+    "DataManager": ".data_manager",
+    "ImageGenerator": ".image_generator", "ImageGenerationError": ".image_generator",
+    
+    # 验证器
+    "Validators": ".validators", "ValidationError": ".validators",
+}
+
+
+def __getattr__(name: str):
+    """按需导入导出名称，导入后写入模块全局变量，之后的访问不再经过此函数"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     # 数据模型
     "UserData", "MessageDate", "PluginConfig",
-    "GroupInfo", "RankData", "RankType",
+    "GroupInfo", "RankData", "RankType", "RankEntry",
     
     # 文件操作工具
     "load_json_file", "save_json_file",
@@ -5,28 +5,55 @@
 支持异步操作和缓存机制。
 """
 
+import functools
+import heapq
 import json
+import operator
+import os
 import re
+import shutil
 import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-import aiofiles
+from typing import List, Optional, Dict, Any, Set, Tuple
 import asyncio
-from datetime import datetime, timedelta
-from cachetools import TTLCache
+from datetime import datetime, date, timedelta
+from cachetools import LRUCache, TTLCache
 from astrbot.api import logger as astrbot_logger
 from collections import defaultdict
 
-from .models import UserData, PluginConfig, MessageDate
+from .models import UserData, PluginConfig, MessageDate, RankType
 from .data_stores import GroupDataStore, ConfigManager, PluginCache
+from .file_utils import json_loads, read_json_sync, write_json_sync
 from .exception_handlers import safe_data_operation, safe_file_operation, safe_cache_operation, safe_config_operation, safe_calculation
 
+# 时间段参数到排行榜类型的映射，按时间段查询时直接读取预聚合的周期计数
+PERIOD_RANK_TYPES = {
+    'day': RankType.DAILY,
+    'week': RankType.WEEKLY,
+    'month': RankType.MONTHLY,
+}
+
+# 清理JSON中多余逗号（对象/数组结尾前的逗号）的正则，模块加载时编译一次
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
 # 缓存配置常量
 # 这些常量控制DataManager中缓存的行为，修改这些值会影响整个插件的缓存性能
 DATA_CACHE_MAXSIZE = 1000  # 数据缓存最大容量，用于缓存群组数据
-DATA_CACHE_TTL = 300  # 数据缓存生存时间（秒），5分钟后过期
-CONFIG_CACHE_MAXSIZE = 10  # 配置缓存最大容量，用于缓存插件配置
+DATA_CACHE_TTL = 300  # 图片缓存生存时间（秒），5分钟后过期；群组数据缓存写入时显式失效，不按时间过期
 CONFIG_CACHE_TTL = 60  # 配置缓存生存时间（秒），1分钟后过期
+DATA_FAILOVER_TTL = 3600  # 群组数据故障转移缓存生存时间（秒），主缓存淘汰后读取文件出错时仍可返回内存中的数据
+
+# 按总发言数取值/排序的键函数（C实现，避免逐个调用lambda）
+_MC_KEY = operator.attrgetter('message_count')
+
+# (用户, 时间段发言数) 元组按发言数排序的键函数
+_PAIR_COUNT_KEY = operator.itemgetter(1)
+
+# 群组锁分片数量（必须是2的幂），群组ID按哈希映射到固定的锁上
+GROUP_LOCK_SHARDS = 64
+
+# 清理旧数据时同时进行的删除数量上限，避免一次性占满线程池和文件句柄
+CLEANUP_CONCURRENCY = 16
 
 
 class DataManager:
@@ -68,20 +95,39 @@ class DataManager:
         self.cache_manager = PluginCache(
             data_cache_maxsize=DATA_CACHE_MAXSIZE,
             data_cache_ttl=DATA_CACHE_TTL,
-            config_cache_maxsize=CONFIG_CACHE_MAXSIZE,
-            config_cache_ttl=CONFIG_CACHE_TTL,
             logger=self.logger
         )
         
+        # 当天的 MessageDate 及其失效时间戳（次日本地零点），跨天前每条消息直接复用
+        self._today_message_date: Optional[MessageDate] = None
+        self._today_expires_at = 0.0
+        
+        # 正在进行中的群组数据加载任务，用于合并同一群组的并发缓存未命中
+        self._inflight_loads: Dict[str, asyncio.Task] = {}
+        
+        # 群组用户索引：群组ID -> (缓存中的用户列表, 以用户ID为键的字典)
+        # 与 data_cache 中的列表对应，列表对象未变化时复用字典，写入时不必每次重建
+        self._user_index = LRUCache(maxsize=DATA_CACHE_MAXSIZE)
+        
+        # 群组数据的故障转移缓存：主缓存按LRU淘汰后重新加载时若读取文件出错，
+        # 返回这里保留的数据，而不是把空列表当作群组数据。
+        # 注意这里保存的是与 data_cache 相同的列表对象（别名，不是快照），批量更新原地修改时
+        # 两边同时可见；它只用于在LRU淘汰后继续持有这份数据，不提供"最后一次正确保存"的语义
+        self._failover_cache = TTLCache(maxsize=DATA_CACHE_MAXSIZE, ttl=DATA_FAILOVER_TTL)
+        
         # 群组级别的锁机制，防止并发安全问题
-        self._group_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # 使用固定数量的分片锁，内存占用不随群组数量增长；两个群组落在同一分片时
+        # 只是写入互相排队，批量落盘下每次写入都很短，影响可以忽略
+        self._lock_shards = tuple(asyncio.Lock() for _ in range(GROUP_LOCK_SHARDS))
         
         # 确保目录存在
         self._ensure_directories()
         
         # 获取缓存实例的引用，方便使用
         self.data_cache = self.cache_manager.get_data_cache()
-        self.config_cache = self.cache_manager.get_config_cache()
+        self.image_cache = self.cache_manager.get_image_cache()
+        # 插件配置缓存：(过期时间, 配置)，按 time.monotonic() 判断是否过期
+        self._config_cached: Optional[Tuple[float, PluginConfig]] = None
         
         # 添加对plugin_config的引用，用于日志控制
         self.plugin_config = None
@@ -160,7 +206,7 @@ class DataManager:
             bool: 格式是否有效
         """
         try:
-            json.loads(content)
+            json_loads(content)
             return True
         except json.JSONDecodeError:
             return False
@@ -181,27 +227,24 @@ class DataManager:
         """
         try:
             # 首先尝试直接解析
-            return await asyncio.to_thread(json.loads, content)
+            return await asyncio.to_thread(json_loads, content)
         except json.JSONDecodeError:
             pass
         
         try:
-            # 尝试简单修复：清理多余的逗号
-            cleaned_content = re.sub(r',(\s*[}\]])', r'\1', content)
-            return await asyncio.to_thread(json.loads, cleaned_content)
+            # 尝试简单修复：清理多余的逗号；没有可清理的逗号时内容不变，无需再解析一次
+            cleaned_content, replaced = _TRAILING_COMMA_RE.subn(r'\1', content)
+            if not replaced:
+                raise json.JSONDecodeError("没有可修复的多余逗号", content, 0)
+            return await asyncio.to_thread(json_loads, cleaned_content)
         except (json.JSONDecodeError, UnicodeDecodeError):
             # 简单修复失败，采用稳健策略：备份并重建
             self.logger.warning(f"JSON文件 {file_path} 损坏，创建备份并重建")
             
             try:
-                # 创建备份文件
+                # 备份损坏文件并创建新的空数据文件，两次写入放在同一次线程切换中完成
                 backup_path = file_path.with_suffix('.backup')
-                async with aiofiles.open(backup_path, 'w', encoding='utf-8') as f:
-                    await f.write(content)
-                
-                # 创建新的空数据文件
-                async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                    await f.write('[]')
+                await asyncio.to_thread(self._backup_and_reset_sync, file_path, backup_path, content)
                 
                 self.logger.info(f"已备份损坏文件到 {backup_path}，并创建新的空数据文件")
                 return []
@@ -210,10 +253,22 @@ class DataManager:
                 self.logger.error(f"备份和重建文件失败: {e}")
                 return []
     
+    @staticmethod
+    def _backup_and_reset_sync(file_path: Path, backup_path: Path, content: str):
+        """同步写入损坏内容的备份，并把原文件重置为空列表
+        
+        Args:
+            file_path (Path): 损坏的数据文件路径
+            backup_path (Path): 备份文件路径
+            content (str): 损坏的JSON内容
+        """
+        backup_path.write_text(content, encoding='utf-8')
+        file_path.write_text('[]', encoding='utf-8')
+    
     async def _save_json_safely(self, file_path: Path, data: List[Dict]) -> bool:
         """安全地保存JSON数据
         
-        使用临时文件确保原子性写入。
+        使用临时文件确保原子性写入，序列化、写入和替换在一次线程切换中完成。
         
         Args:
             file_path (Path): 目标文件路径
@@ -223,29 +278,17 @@ class DataManager:
             bool: 保存是否成功
         """
         try:
-            # 创建临时文件
-            temp_file = file_path.with_suffix('.tmp')
-            
-            # 写入临时文件
-            async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
-                json_content = await asyncio.to_thread(json.dumps, data, ensure_ascii=False, indent=2)
-                await f.write(json_content)
-            
-            # 原子性移动到目标文件
-            await asyncio.to_thread(temp_file.replace, file_path)
+            # 写入临时文件后原子性替换目标文件，群组数据使用紧凑格式
+            await asyncio.to_thread(write_json_sync, file_path, data, compact=True)
             return True
             
         except (IOError, OSError) as e:
+            # 临时文件已由 write_json_sync 在失败时删除
             self.logger.error(f"安全保存文件失败: {e}")
-            # 清理临时文件
-            temp_file = file_path.with_suffix('.tmp')
-            if await asyncio.to_thread(temp_file.exists):
-                await asyncio.to_thread(temp_file.unlink)
             return False
     
     # ========== 群组数据管理 ==========
     
-    @safe_data_operation(default_return=[])
     async def get_group_data(self, group_id: str) -> List[UserData]:
         """获取群组数据
         
@@ -256,38 +299,90 @@ class DataManager:
             
         Returns:
             List[UserData]: 用户数据列表，如果读取失败则返回空列表
+        """
+        try:
+            return await self._fetch_group_data(group_id)
+        except (IOError, OSError) as e:
+            self.logger.error(f"获取群组 {group_id} 数据失败(系统错误): {e}")
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            self.logger.error(f"获取群组 {group_id} 数据失败(数据错误): {e}")
+        except RuntimeError as e:
+            self.logger.error(f"获取群组 {group_id} 数据失败(运行时错误): {e}")
+        # 每次失败都返回新的空列表：调用方可能向列表中追加用户，
+        # 不能像装饰器的 default_return 那样在所有调用之间共享同一个对象
+        return []
+    
+    async def _fetch_group_data(self, group_id: str) -> List[UserData]:
+        """获取群组数据，读取失败时抛出异常
+        
+        写入路径使用此方法：读取失败时应跳过该群组的写入，而不是在空列表上继续更新并保存。
+        
+        Args:
+            group_id (str): 群组ID，必须是有效的数字字符串
+            
+        Returns:
+            List[UserData]: 缓存中的用户数据列表
             
         Raises:
             ValueError: 当group_id格式不正确时
+            OSError: 当读取数据文件失败且没有故障转移数据时
         """
         if not group_id.isdigit():
             raise ValueError(f"群组ID必须是数字字符串，当前值: {group_id}")
         
-        cache_key = f"group_data_{group_id}"
+        # 检查缓存（数据缓存直接以群组ID为键）
+        users = self.data_cache.get(group_id)
+        if users is not None:
+            return users
         
-        # 检查缓存
-        if cache_key in self.data_cache:
-            return self.data_cache[cache_key]
+        # 同一群组同时只加载一次，并发的未命中请求共享同一个加载任务
+        task = self._inflight_loads.get(group_id)
+        if task is None:
+            task = asyncio.create_task(self._load_group_data_into_cache(group_id))
+            self._inflight_loads[group_id] = task
+            task.add_done_callback(lambda _, gid=group_id: self._inflight_loads.pop(gid, None))
         
-        # 使用GroupDataStore加载数据
-        users = await self.group_store.load_group_data(group_id)
+        # shield：某个调用方被取消时不影响其他等待同一任务的调用方
+        return await asyncio.shield(task)
+    
+    async def _load_group_data_into_cache(self, group_id: str) -> List[UserData]:
+        """从文件加载群组数据并写入缓存
         
-        # 缓存结果
-        self.data_cache[cache_key] = users
+        Args:
+            group_id (str): 群组ID
+            
+        Returns:
+            List[UserData]: 用户数据列表
+        """
+        # 使用GroupDataStore加载数据
+        try:
+            users = await self.group_store.load_group_data(group_id)
+        except OSError:
+            users = self._failover_cache.get(group_id)
+            if users is None:
+                raise
+            # 故障转移的数据不写入主缓存，下次读取时重新尝试加载文件
+            self.logger.warning(f"读取群组 {group_id} 数据失败，使用故障转移缓存中的数据")
+            return users
+        
+        # 缓存结果（故障转移缓存保存同一个列表对象的引用）
+        self.data_cache[group_id] = users
+        self._failover_cache[group_id] = users
         return users
     
-    @safe_data_operation(default_return=None)
-    async def save_group_data(self, group_id: str, users: List[UserData]):
+    @safe_data_operation(default_return=False)
+    async def save_group_data(self, group_id: str, users: List[UserData]) -> bool:
         """保存群组数据
         
-        异步保存指定群组的用户数据到JSON文件，并清除相关缓存。
+        异步保存指定群组的用户数据到JSON文件，并用保存的数据更新缓存，
+        写入后的读取仍然命中缓存，不必重新读取和解析整个文件。
         
         Args:
             group_id (str): 群组ID，必须是有效的数字字符串
             users (List[UserData]): 用户数据列表，将被序列化为JSON格式保存
             
         Returns:
-            None: 无返回值，保存结果通过日志输出
+            bool: 是否保存成功
             
         Raises:
             ValueError: 当group_id格式不正确时
@@ -299,16 +394,16 @@ class DataManager:
         success = await self.group_store.save_group_data(group_id, users)
         
         if success:
-            # 清除缓存
-            cache_key = f"group_data_{group_id}"
-            if cache_key in self.data_cache:
-                del self.data_cache[cache_key]
+            # 更新缓存（写回而不是失效，避免下一次读取重新加载文件）
+            self.data_cache[group_id] = users
+            self._failover_cache[group_id] = users
             
             # 只在开启详细日志时记录群组数据保存信息
             if self.plugin_config and getattr(self.plugin_config, 'detailed_logging_enabled', True):
                 self.logger.info(f"群组 {group_id} 数据已安全保存，共 {len(users)} 个用户")
         else:
             self.logger.error(f"群组 {group_id} 数据保存失败")
+        return success
     
     @safe_data_operation(default_return=False)
     async def update_user_message(self, group_id: str, user_id: str, nickname: str) -> bool:
@@ -335,51 +430,197 @@ class DataManager:
             raise ValueError(f"用户ID必须是数字字符串，当前值: {user_id}")
         
         # 获取群组级别的锁，确保同一群组的数据操作串行化
-        group_lock = self._group_locks[group_id]
+        group_lock = self._get_group_lock(group_id)
         
         async with group_lock:
-            # 获取现有数据
-            users = await self.get_group_data(group_id)
-            current_timestamp = int(datetime.now().timestamp())
-            
-            # 优化性能：将用户列表转换为字典，以 user_id 为键
-            users_dict = {user.user_id: user for user in users}
-            
-            # 查找用户（O(1) 操作）
-            if user_id in users_dict:
-                # 更新现有用户 - 使用add_message方法正确记录历史，同时更新昵称
-                user = users_dict[user_id]
-                user.nickname = nickname  # 重要：更新昵称以反映最新变化
-                today = datetime.now().date()
-                message_date = MessageDate.from_date(today)
-                user.add_message(message_date)
-                user.last_message_time = current_timestamp
-                if user.first_message_time is None:
-                    user.first_message_time = current_timestamp
-            else:
-                # 如果用户不存在，创建新用户
-                # 为新用户创建消息记录
-                today = datetime.now().date()
-                message_date = MessageDate.from_date(today)
-                
-                new_user = UserData(
-                    user_id=user_id,
-                    nickname=nickname,
-                    message_count=0,  # 先设为0，add_message会增加到1
-                    first_message_time=current_timestamp,
-                    last_message_time=current_timestamp
-                )
-                # 添加第一条消息记录（这会将message_count增加到1）
-                new_user.add_message(message_date)
-                users_dict[user_id] = new_user
-            
-            # 将字典转换回列表
-            updated_users = list(users_dict.values())
+            # 获取现有数据和对应的用户索引，原地更新缓存中的列表；读取失败时抛出异常，不写入
+            users = await self._fetch_group_data(group_id)
+            users_dict = self._get_user_index(group_id, users)
+            
+            now = time.time()
+            self._apply_user_messages(
+                users, users_dict, user_id, nickname, 1,
+                self._get_today_message_date(now), int(now)
+            )
             
             # 保存更新后的数据
-            await self.save_group_data(group_id, updated_users)
+            await self.save_group_data(group_id, users)
             return True
     
+    async def bulk_update_user_messages(self, items: Dict[Tuple[str, str, date], Tuple[int, str, int]]) -> Set[str]:
+        """批量更新用户消息统计
+        
+        将一段时间内聚合的发言计数一次性写入，每个群组只加载和保存一次数据，
+        把逐条消息的写入合并为按群组的批量写入。
+        
+        Args:
+            items (Dict[Tuple[str, str, date], Tuple[int, str, int]]): 以 (群组ID, 用户ID, 消息日期) 为键，
+                值为 (新增消息数, 最新昵称, 最后一条消息的时间戳) 的聚合结果
+            
+        Returns:
+            Set[str]: 未写入的群组ID集合（读取或保存失败）。这些群组在内存中的修改已回滚，
+                调用方应把它们的计数保留下来等待重试，重试不会重复计数
+            
+        Raises:
+            ValueError: 当参数格式不正确时（此时没有任何群组被写入）
+            
+        Example:
+            >>> await data_manager.bulk_update_user_messages(
+            ...     {("123456789", "987654321", date.today()): (3, "用户昵称", int(time.time()))})
+            set()
+        """
+        # 按群组归并，保证每个群组只读写一次
+        by_group: Dict[str, List[Tuple[int, str, MessageDate, int, str]]] = defaultdict(list)
+        message_dates: Dict[date, MessageDate] = {}
+        for (group_id, user_id, day), (count, nickname, timestamp) in items.items():
+            if not group_id.isdigit():
+                raise ValueError(f"群组ID必须是数字字符串，当前值: {group_id}")
+            if not user_id.isdigit():
+                raise ValueError(f"用户ID必须是数字字符串，当前值: {user_id}")
+            if count > 0:
+                message_date = message_dates.get(day)
+                if message_date is None:
+                    message_date = message_dates[day] = MessageDate.from_date(day)
+                by_group[group_id].append((timestamp, user_id, message_date, count, nickname))
+        
+        failed_groups: Set[str] = set()
+        for group_id, updates in by_group.items():
+            async with self._get_group_lock(group_id):
+                try:
+                    users = await self._fetch_group_data(group_id)
+                except (IOError, OSError) as e:
+                    # 读取失败时跳过该群组，不在空列表上更新，也不保存覆盖原文件
+                    self.logger.error(f"读取群组 {group_id} 数据失败，本次跳过写入: {e}")
+                    failed_groups.add(group_id)
+                    continue
+                users_dict = self._get_user_index(group_id, users)
+                
+                # 更新是在缓存的列表上原地进行的，先记录涉及的用户的状态，保存失败时回滚，
+                # 这样调用方重试时不会把已经应用到内存中的计数再加一遍
+                users_len = len(users)
+                checkpoints = {}
+                try:
+                    # 按时间先后应用，同一用户跨天的计数最后留下的是最新的昵称和发言时间
+                    updates.sort(key=operator.itemgetter(0))
+                    for timestamp, user_id, message_date, count, nickname in updates:
+                        user = users_dict.get(user_id)
+                        if user is not None and user_id not in checkpoints:
+                            checkpoints[user_id] = (user, user.checkpoint())
+                        self._apply_user_messages(users, users_dict, user_id, nickname, count, message_date, timestamp)
+                    
+                    saved = await self.save_group_data(group_id, users)
+                except (KeyError, TypeError, ValueError, AttributeError, RuntimeError) as e:
+                    self.logger.error(f"更新群组 {group_id} 发言统计失败: {e}")
+                    saved = False
+                
+                if not saved:
+                    self._rollback_user_messages(users, users_dict, users_len, checkpoints.values())
+                    failed_groups.add(group_id)
+        
+        return failed_groups
+    
+    @staticmethod
+    def _rollback_user_messages(users: List[UserData], users_dict: Dict[str, UserData], users_len: int,
+                                checkpoints):
+        """撤销一次批量更新对缓存中用户数据的修改
+        
+        Args:
+            users (List[UserData]): 群组用户列表
+            users_dict (Dict[str, UserData]): 以用户ID为键的用户索引
+            users_len (int): 更新前的用户数量，之后追加的新用户会被移除
+            checkpoints: (用户, checkpoint()状态) 的可迭代对象
+        """
+        for user in users[users_len:]:
+            users_dict.pop(user.user_id, None)
+        del users[users_len:]
+        for user, state in checkpoints:
+            user.rollback(state)
+    
+    def _get_group_lock(self, group_id: str) -> asyncio.Lock:
+        """获取群组所在分片的锁
+        
+        Args:
+            group_id (str): 群组ID
+            
+        Returns:
+            asyncio.Lock: 该群组对应的分片锁
+        """
+        return self._lock_shards[hash(group_id) & (GROUP_LOCK_SHARDS - 1)]
+    
+    def _get_today_message_date(self, now: float) -> MessageDate:
+        """获取当天的 MessageDate（跨天前复用同一个对象）
+        
+        按本地时区的次日零点判断是否跨天，每条消息只需一次浮点比较，
+        不必每次调用 datetime.now() 和构造新的日期对象。
+        
+        Args:
+            now (float): 当前时间戳（time.time()）
+            
+        Returns:
+            MessageDate: 当天日期
+        """
+        if now >= self._today_expires_at or self._today_message_date is None:
+            today = date.fromtimestamp(now)
+            self._today_message_date = MessageDate.from_date(today)
+            self._today_expires_at = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        return self._today_message_date
+    
+    def _get_user_index(self, group_id: str, users: List[UserData]) -> Dict[str, UserData]:
+        """获取群组用户列表对应的 用户ID -> UserData 字典
+        
+        字典只在缓存的列表对象变化（重新加载、导入等）时重建，
+        同一列表上的连续写入直接复用，查找用户为O(1)。
+        
+        Args:
+            group_id (str): 群组ID
+            users (List[UserData]): get_group_data 返回的用户列表
+            
+        Returns:
+            Dict[str, UserData]: 以用户ID为键的用户字典
+        """
+        entry = self._user_index.get(group_id)
+        if entry is not None and entry[0] is users and len(entry[1]) == len(users):
+            return entry[1]
+        
+        users_dict = {user.user_id: user for user in users}
+        self._user_index[group_id] = (users, users_dict)
+        return users_dict
+    
+    def _apply_user_messages(self, users: List[UserData], users_dict: Dict[str, UserData], user_id: str,
+                             nickname: str, count: int, message_date: MessageDate, timestamp: int):
+        """将若干条发言记录应用到用户列表和索引中
+        
+        Args:
+            users (List[UserData]): 群组用户列表，新用户会追加到末尾
+            users_dict (Dict[str, UserData]): 以用户ID为键的用户数据字典，会被原地修改
+            user_id (str): 用户ID
+            nickname (str): 用户最新昵称
+            count (int): 新增消息数
+            message_date (MessageDate): 消息日期
+            timestamp (int): 消息时间戳
+        """
+        user = users_dict.get(user_id)
+        if user is None:
+            # 如果用户不存在，创建新用户（message_count先设为0，由add_message累加）
+            user = UserData(
+                user_id=user_id,
+                nickname=nickname,
+                message_count=0,
+                first_message_time=timestamp,
+                last_message_time=timestamp
+            )
+            users_dict[user_id] = user
+            users.append(user)
+        else:
+            # 更新现有用户 - 同时更新昵称以反映最新变化
+            user.nickname = nickname
+            user.last_message_time = timestamp
+            if user.first_message_time is None:
+                user.first_message_time = timestamp
+        
+        # 批量记录历史，日期解析和周期滚动只做一次
+        user.add_messages(message_date, count)
+    
     @safe_data_operation(default_return=False)
     async def clear_group_data(self, group_id: str) -> bool:
         """清空群组数据
@@ -394,17 +635,25 @@ class DataManager:
         """
         file_path = self.groups_dir / f"{group_id}.json"
         
-        if await aiofiles.os.path.exists(file_path):
-            await aiofiles.os.remove(file_path)
+        # 存在性检查与删除合并为一次线程调度
+        await asyncio.to_thread(self._remove_file_sync, file_path)
         
         # 清除缓存
-        cache_key = f"group_data_{group_id}"
-        if cache_key in self.data_cache:
-            del self.data_cache[cache_key]
+        self.data_cache.pop(group_id, None)
+        self._failover_cache.pop(group_id, None)
+        self._user_index.pop(group_id, None)
         
         self.logger.info(f"群组 {group_id} 数据已清空")
         return True
     
+    @staticmethod
+    def _remove_file_sync(file_path: Path):
+        """同步删除文件，文件不存在时忽略"""
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+    
     @safe_data_operation(default_return=None)
     async def get_user_in_group(self, group_id: str, user_id: str) -> Optional[UserData]:
         """获取群组中的用户信息
@@ -433,9 +682,24 @@ class DataManager:
         Returns:
             List[str]: 群组ID列表
         """
-        group_files = list(self.groups_dir.glob("*.json"))
-        group_ids = [file.stem for file in group_files if file.is_file()]
-        return group_ids
+        group_files = await asyncio.to_thread(self._scan_group_files_sync)
+        return [group_id for group_id, _ in group_files]
+    
+    def _scan_group_files_sync(self) -> List[Tuple[str, float]]:
+        """同步扫描群组数据目录
+        
+        使用 os.scandir 一次遍历目录，文件类型直接取自目录项，
+        修改时间也在同一次线程切换中取得，调用方无需再逐个文件 stat。
+        
+        Returns:
+            List[Tuple[str, float]]: (群组ID, 文件修改时间) 列表
+        """
+        with os.scandir(self.groups_dir) as entries:
+            return [
+                (entry.name[:-5], entry.stat().st_mtime)
+                for entry in entries
+                if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False)
+            ]
     
     # ========== 配置管理 ==========
     
@@ -456,21 +720,18 @@ class DataManager:
             IOError: 当配置文件读取失败时抛出
             json.JSONDecodeError: 当配置文件格式错误时抛出
         """
-        cache_key = "plugin_config"
-        
-        # 检查缓存
-        if cache_key in self.config_cache:
-            return self.config_cache[cache_key]
+        # 检查缓存（只有一份配置，用 (过期时间, 配置) 元组缓存即可）
+        cached = self._config_cached
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
         
         if await asyncio.to_thread(self.config_file.exists):
-            async with aiofiles.open(self.config_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                config_data = await asyncio.to_thread(json.loads, content)
+            config_data = await asyncio.to_thread(read_json_sync, self.config_file)
             
             config = PluginConfig.from_dict(config_data)
             
             # 缓存配置
-            self.config_cache[cache_key] = config
+            self._config_cached = (time.monotonic() + CONFIG_CACHE_TTL, config)
             return config
         else:
             # 如果配置文件不存在，创建默认配置
@@ -496,9 +757,7 @@ class DataManager:
         
         if success:
             # 清除配置缓存
-            cache_key = "plugin_config"
-            if cache_key in self.config_cache:
-                del self.config_cache[cache_key]
+            self._config_cached = None
             
             self.logger.info("插件配置已保存")
         else:
@@ -559,10 +818,7 @@ class DataManager:
             Optional[str]: 图片路径，如果缓存不存在则返回None
         """
         try:
-            image_cache_key = f"image_{cache_key}"
-            if image_cache_key in self.data_cache:
-                return self.data_cache[image_cache_key]
-            return None
+            return self.image_cache.get(cache_key)
         except (KeyError, TypeError) as e:
             self.logger.error(f"缓存键格式错误: {e}")
             return None
@@ -585,8 +841,7 @@ class DataManager:
             bool: 缓存是否成功
         """
         try:
-            image_cache_key = f"image_{cache_key}"
-            self.data_cache[image_cache_key] = image_path
+            self.image_cache[cache_key] = image_path
             return True
         except (KeyError, TypeError) as e:
             self.logger.error(f"缓存键格式错误: {e}")
@@ -607,17 +862,17 @@ class DataManager:
         try:
             if cache_type in ["all", "data"]:
                 self.data_cache.clear()
+                self._failover_cache.clear()
+                self._user_index.clear()
                 self.logger.info("数据缓存已清空")
             
             if cache_type in ["all", "config"]:
-                self.config_cache.clear()
+                self._config_cached = None
                 self.logger.info("配置缓存已清空")
                 
             if cache_type in ["all", "image"]:
                 # 清除图片缓存
-                image_keys = [key for key in self.data_cache.keys() if key.startswith("image_")]
-                for key in image_keys:
-                    del self.data_cache[key]
+                self.image_cache.clear()
                 self.logger.info("图片缓存已清空")
                 
         except (KeyError, TypeError) as e:
@@ -626,14 +881,16 @@ class DataManager:
             # 捕获运行时错误和系统错误
             self.logger.error(f"清空缓存时发生未知错误: {e}")
     
-    def _generate_cache_key(self, prefix: str, *args) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _generate_cache_key(prefix: str, *args) -> str:
         """生成缓存键
         
-        根据前缀和参数生成唯一的缓存键。
+        根据前缀和参数生成唯一的缓存键。相同参数的结果会被缓存，重复生成时直接返回。
         
         Args:
             prefix (str): 前缀
-            *args: 参数
+            *args: 参数（需可哈希）
             
         Returns:
             str: 生成的缓存键
@@ -649,12 +906,15 @@ class DataManager:
             Dict[str, Any]: 缓存统计信息
         """
         try:
+            cached = self._config_cached
+            config_cache_size = 1 if cached is not None and cached[0] > time.monotonic() else 0
             return {
                 "data_cache_size": len(self.data_cache),
                 "data_cache_maxsize": self.data_cache.maxsize,
-                "config_cache_size": len(self.config_cache),
-                "config_cache_maxsize": self.config_cache.maxsize,
-                "total_cache_size": len(self.data_cache) + len(self.config_cache)
+                "image_cache_size": len(self.image_cache),
+                "config_cache_size": config_cache_size,
+                "config_cache_maxsize": 1,
+                "total_cache_size": len(self.data_cache) + len(self.image_cache) + config_cache_size
             }
         except (KeyError, TypeError, AttributeError) as e:
             self.logger.error(f"缓存统计信息获取错误: {e}")
@@ -686,31 +946,7 @@ class DataManager:
         """
         try:
             users = await self.get_group_data(group_id)
-            
-            if not users:
-                return {
-                    "total_users": 0,
-                    "total_messages": 0,
-                    "active_users": 0,
-                    "average_messages": 0,
-                    "top_user": None
-                }
-            
-            total_messages = sum(user.message_count for user in users)
-            active_users = len([user for user in users if user.message_count > 0])
-            top_user = max(users, key=lambda x: x.message_count) if users else None
-            
-            return {
-                "total_users": len(users),
-                "total_messages": total_messages,
-                "active_users": active_users,
-                "average_messages": total_messages / len(users) if users else 0,
-                "top_user": {
-                    "user_id": top_user.user_id,
-                    "nickname": top_user.nickname,
-                    "message_count": top_user.message_count
-                } if top_user else None
-            }
+            return self._compute_group_statistics(users)
         except (IOError, OSError) as e:
             self.logger.error(f"获取群组 {group_id} 统计信息时文件操作失败: {e}")
             return {
@@ -740,6 +976,44 @@ class DataManager:
                 "top_user": None
             }
     
+    @staticmethod
+    def _compute_group_statistics(users: List[UserData]) -> Dict[str, Any]:
+        """根据用户列表计算群组统计信息
+        
+        Args:
+            users (List[UserData]): 群组用户数据
+            
+        Returns:
+            Dict[str, Any]: 群组统计信息
+        """
+        if not users:
+            return {
+                "total_users": 0,
+                "total_messages": 0,
+                "active_users": 0,
+                "average_messages": 0,
+                "top_user": None
+            }
+        
+        # 先一次性取出发言数列，之后的求和、计数、取最大值都在内置函数中完成
+        counts = list(map(_MC_KEY, users))
+        total_messages = sum(counts)
+        active_users = sum(1 for c in counts if c > 0)
+        # 在整数列上取最大值再定位下标（相当于argmax），与 max(users, key=...) 一样取第一个最大者
+        top_user = users[counts.index(max(counts))]
+        
+        return {
+            "total_users": len(users),
+            "total_messages": total_messages,
+            "active_users": active_users,
+            "average_messages": total_messages / len(users),
+            "top_user": {
+                "user_id": top_user.user_id,
+                "nickname": top_user.nickname,
+                "message_count": top_user.message_count
+            }
+        }
+    
     @safe_calculation(default_return=[])
     async def get_top_users(self, group_id: str, limit: int = 10) -> List[UserData]:
         """获取排行榜用户
@@ -755,10 +1029,9 @@ class DataManager:
         """
         try:
             users = await self.get_group_data(group_id)
-            # 过滤掉0次发言的用户，然后按消息数降序排序
-            active_users = [user for user in users if user.message_count > 0]
-            sorted_users = sorted(active_users, key=lambda x: x.message_count, reverse=True)
-            return sorted_users[:limit]
+            # 过滤掉0次发言的用户，用堆取消息数最多的前limit名（O(N log K)，无需全量排序）
+            active_users = (user for user in users if user.message_count > 0)
+            return heapq.nlargest(limit, active_users, key=_MC_KEY)
         except (IOError, OSError) as e:
             self.logger.error(f"获取群组 {group_id} 排行榜时文件操作失败: {e}")
             return []
@@ -770,7 +1043,7 @@ class DataManager:
             self.logger.error(f"获取群组 {group_id} 排行榜时发生未知错误: {e}")
             return []
     
-    async def get_users_by_time_period(self, group_id: str, period: str) -> List[tuple]:
+    async def get_users_by_time_period(self, group_id: str, period: str, limit: Optional[int] = None) -> List[tuple]:
         """按时间段获取用户
         
         根据时间段获取活跃用户列表，返回用户对象和该时间段内消息数的元组列表。
@@ -778,6 +1051,7 @@ class DataManager:
         Args:
             group_id (str): 群组ID
             period (str): 时间段，'day', 'week', 'month'
+            limit (Optional[int]): 只返回消息数最多的前limit名，默认返回全部
             
         Returns:
             List[tuple]: 包含用户对象和消息数的元组列表，格式为[(UserData, count)]，按消息数降序排序
@@ -791,34 +1065,25 @@ class DataManager:
             if not users:
                 return []
             
-            # 计算时间范围
-            current_date = datetime.now().date()
-            
-            if period == 'day':
-                # 今日用户
-                start_date = current_date
-                end_date = current_date
-            elif period == 'week':
-                # 本周用户（从周一开始到当前日期）
-                days_since_monday = current_date.weekday()
-                start_date = current_date - timedelta(days=days_since_monday)
-                end_date = current_date
-            elif period == 'month':
-                # 本月用户（从月初到当前日期）
-                start_date = current_date.replace(day=1)
-                end_date = current_date
-            else:
+            rank_type = PERIOD_RANK_TYPES.get(period)
+            if rank_type is None:
                 raise ValueError(f"无效的时间段参数: {period}，支持的值为: 'day', 'week', 'month'")
             
-            # 过滤在指定时间段内有发言的用户，返回用户和计数的元组列表
+            current_date = date.today()
+            
+            # 读取每个用户预聚合的周期计数（今日/本周/本月），不再逐条扫描发言历史；
+            # 周期边界由 _period_bounds 按日期缓存，所有用户共享同一组边界
             user_count_pairs = []
+            append = user_count_pairs.append
             for user in users:
-                message_count_in_period = user.get_message_count_in_period(start_date, end_date)
+                message_count_in_period = user.get_period_count(rank_type, current_date)
                 if message_count_in_period > 0:
-                    user_count_pairs.append((user, message_count_in_period))
+                    append((user, message_count_in_period))
             
-            # 按时间段内的消息数降序排序
-            user_count_pairs.sort(key=lambda x: x[1], reverse=True)
+            # 只需要前limit名时用堆选取（O(N log K)），否则按时间段内的消息数降序全量排序
+            if limit is not None:
+                return heapq.nlargest(limit, user_count_pairs, key=_PAIR_COUNT_KEY)
+            user_count_pairs.sort(key=_PAIR_COUNT_KEY, reverse=True)
             
             return user_count_pairs
             
@@ -856,7 +1121,8 @@ class DataManager:
                 "group_id": group_id,
                 "export_time": time.time(),
                 "users": [user.to_dict() for user in users],
-                "statistics": await self.get_group_statistics(group_id)
+                # 直接使用已取得的用户列表计算统计，不再重新获取群组数据
+                "statistics": self._compute_group_statistics(users)
             }
         except (IOError, OSError) as e:
             self.logger.error(f"导出群组 {group_id} 数据时文件操作失败: {e}")
@@ -932,26 +1198,28 @@ class DataManager:
             
             cleaned_count = 0
             
-            # 获取所有群组文件
-            group_files = list(self.groups_dir.glob("*.json"))
+            # 一次扫描取得所有群组文件及其修改时间
+            group_files = await asyncio.to_thread(self._scan_group_files_sync)
             
-            # 并发执行 stat 检查
-            async def check_and_clean(file_path):
-                try:
-                    # 使用 asyncio.to_thread 将同步的 stat() 调用移到工作线程
-                    file_stat = await asyncio.to_thread(file_path.stat)
-                    if file_stat.st_mtime < cutoff_time:
-                        group_id = file_path.stem
-                        await self.clear_group_data(group_id)
+            semaphore = asyncio.Semaphore(CLEANUP_CONCURRENCY)
+            
+            async def clean(group_id):
+                async with semaphore:
+                    try:
+                        # clear_group_data 出错时返回False而不抛出异常
+                        if not await self.clear_group_data(group_id):
+                            self.logger.error(f"清理群组 {group_id} 数据失败")
+                            return False
                         self.logger.info(f"已清理群组 {group_id} 的旧数据")
                         return True
-                    return False
-                except Exception as e:
-                    self.logger.error(f"清理群组 {file_path.stem} 数据失败: {e}")
-                    return False
-            
-            # 并发执行所有文件的检查和清理
-            results = await asyncio.gather(*[check_and_clean(f) for f in group_files])
+                    except Exception as e:
+                        self.logger.error(f"清理群组 {group_id} 数据失败: {e}")
+                        return False
+            
+            # 并发清理所有过期群组，同时进行的删除数量受信号量限制
+            results = await asyncio.gather(*[
+                clean(group_id) for group_id, mtime in group_files if mtime < cutoff_time
+            ])
             cleaned_count = sum(results)
             
             self.logger.info(f"数据清理完成，共清理 {cleaned_count} 个群组")
@@ -990,12 +1258,8 @@ class DataManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = backup_dir / f"{group_id}_{timestamp}.json"
             
-            # 复制文件
-            async with aiofiles.open(source_file, 'r', encoding='utf-8') as src:
-                content = await src.read()
-            
-            async with aiofiles.open(backup_file, 'w', encoding='utf-8') as dst:
-                await dst.write(content)
+            # 复制文件，整个复制过程在一次线程调度内完成
+            await asyncio.to_thread(shutil.copyfile, source_file, backup_file)
             
             self.logger.info(f"群组 {group_id} 数据已备份到: {backup_file}")
             return backup_file
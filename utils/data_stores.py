@@ -5,22 +5,22 @@
 
 import json
 import asyncio
-import aiofiles
-import aiofiles.os
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from astrbot.api import logger as astrbot_logger
-from cachetools import TTLCache
+from cachetools import LRUCache, TTLCache
 
 from .models import UserData, PluginConfig, MessageDate
+from .file_utils import json_loads, read_json_sync, write_json_sync
 
 
 # 缓存配置常量
 DATA_CACHE_MAXSIZE = 1000
 DATA_CACHE_TTL = 300  # 5分钟
-CONFIG_CACHE_MAXSIZE = 10
-CONFIG_CACHE_TTL = 60  # 1分钟
+GROUP_NAME_CACHE_MAXSIZE = 100
+GROUP_NAME_CACHE_TTL = 3600  # 群名称缓存时间（秒），群名很少变化
+GROUP_NAME_FAILURE_TTL = 60  # 群名称获取失败时默认名称的缓存时间（秒），避免频繁请求失败的API
 
 
 class GroupDataStore:
@@ -32,29 +32,27 @@ class GroupDataStore:
     def __init__(self, groups_dir: Path, logger=None):
         self.groups_dir = groups_dir
         self.logger = logger or astrbot_logger
-        # 目录创建延迟到首次使用时异步执行
+        # 构造时同步创建一次目录，mkdir本身很快，不必每次读取都提交到线程池
+        self._ensure_groups_directory()
     
-    async def _ensure_groups_directory(self):
+    def _ensure_groups_directory(self):
         """确保群组数据目录存在"""
-        await asyncio.to_thread(self.groups_dir.mkdir, parents=True, exist_ok=True)
+        self.groups_dir.mkdir(parents=True, exist_ok=True)
     
     def _get_group_file_path(self, group_id: str) -> Path:
         """获取群组数据文件路径"""
         return self.groups_dir / f"{group_id}.json"
     
     async def load_group_data(self, group_id: str) -> List[UserData]:
-        """加载群组数据"""
-        # 确保目录存在
-        await self._ensure_groups_directory()
-        file_path = self._get_group_file_path(group_id)
+        """加载群组数据
         
-        if not await aiofiles.os.path.exists(file_path):
-            return []
+        文件不存在或内容损坏时返回空列表；读取文件出错时抛出 OSError。
+        """
+        file_path = self._get_group_file_path(group_id)
         
         try:
-            async with aiofiles.open(str(file_path), 'r', encoding='utf-8') as f:
-                content = await f.read()
-                data = await asyncio.to_thread(json.loads, content)
+            # 读取和解析在同一次线程切换中完成
+            data = await asyncio.to_thread(read_json_sync, file_path)
             
             # 转换为UserData对象列表
             users = []
@@ -82,25 +80,32 @@ class GroupDataStore:
             
             return users
             
-        except (IOError, json.JSONDecodeError) as e:
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError as e:
             self.logger.error(f"读取群组数据失败 {group_id}: {e}")
             return []
+        except OSError as e:
+            # 读取出错不等于群组没有数据，交给调用方决定是否使用故障转移缓存
+            self.logger.error(f"读取群组数据失败 {group_id}: {e}")
+            raise
     
     async def save_group_data(self, group_id: str, users: List[UserData]) -> bool:
         """保存群组数据"""
         file_path = self._get_group_file_path(group_id)
         
         try:
-            # 准备数据
+            # 准备数据：在事件循环中生成字典快照，工作线程只处理这份快照，
+            # 不接触会被其他协程修改的 UserData 对象
             data = {
                 'group_id': group_id,
                 'last_updated': datetime.now().isoformat(),
                 'users': [user.to_dict() for user in users]
             }
             
-            json_content = await asyncio.to_thread(json.dumps, data, ensure_ascii=False, indent=2)
-            async with aiofiles.open(str(file_path), 'w', encoding='utf-8') as f:
-                await f.write(json_content)
+            # 序列化、写入临时文件和原子替换在同一次线程切换中完成
+            # 群组数据文件只由插件读写，使用紧凑格式减少每次保存的写入量
+            await asyncio.to_thread(write_json_sync, file_path, data, compact=True)
             
             return True
             
@@ -112,42 +117,55 @@ class GroupDataStore:
         """删除群组数据"""
         file_path = self._get_group_file_path(group_id)
         
+        # 直接删除，不再先检查是否存在：一次线程池调用，也没有检查与删除之间的竞态
         try:
-            if await aiofiles.os.path.exists(file_path):
-                await aiofiles.os.remove(file_path)
-                return True
+            await asyncio.to_thread(file_path.unlink)
+            return True
+        except FileNotFoundError:
             return False
         except OSError as e:
             self.logger.error(f"删除群组数据失败 {group_id}: {e}")
             return False
     
+    @staticmethod
+    def _backup_if_corrupted_sync(file_path: Path, backup_path: Path) -> bool:
+        """同步检查JSON文件，损坏时原样备份
+        
+        以字节形式读取并直接解析，不先解码为字符串；备份也按原始字节写出，
+        即使文件中有非法的UTF-8序列也能完整保留。
+        
+        Args:
+            file_path (Path): 群组数据文件路径
+            backup_path (Path): 备份文件路径
+            
+        Returns:
+            bool: 文件是否损坏（损坏时已写出备份）
+        """
+        content = file_path.read_bytes()
+        try:
+            json_loads(content)
+            return False
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            backup_path.write_bytes(content)
+            return True
+    
     async def repair_corrupted_json(self, group_id: str) -> bool:
         """修复损坏的JSON文件"""
         file_path = self._get_group_file_path(group_id)
         
-        if not await aiofiles.os.path.exists(file_path):
-            return False
-        
         try:
-            # 读取文件内容
-            async with aiofiles.open(str(file_path), 'r', encoding='utf-8') as f:
-                content = await f.read()
-            
-            # 尝试解析JSON
-            try:
-                await asyncio.to_thread(json.loads, content)
+            # 读取并校验文件内容，损坏时直接写出备份，整个过程只需一次线程切换
+            backup_path = file_path.with_suffix('.json.backup')
+            if not await asyncio.to_thread(self._backup_if_corrupted_sync, file_path, backup_path):
                 return True  # 文件正常
-            except json.JSONDecodeError:
-                # 文件损坏，创建备份
-                backup_path = file_path.with_suffix('.json.backup')
-                async with aiofiles.open(str(backup_path), 'w', encoding='utf-8') as f:
-                    await f.write(content)
-                
-                # 创建新的空数据文件
-                await self.save_group_data(group_id, [])
-                self.logger.warning(f"已修复损坏的群组数据文件 {group_id}，备份保存至 {backup_path}")
-                return True
-                
+            
+            # 创建新的空数据文件
+            await self.save_group_data(group_id, [])
+            self.logger.warning(f"已修复损坏的群组数据文件 {group_id}，备份保存至 {backup_path}")
+            return True
+        
+        except FileNotFoundError:
+            return False
         except (IOError, OSError) as e:
             self.logger.error(f"修复群组数据失败 {group_id}: {e}")
             return False
@@ -162,30 +180,27 @@ class ConfigManager:
     def __init__(self, config_file: Path, logger=None):
         self.config_file = config_file
         self.logger = logger or astrbot_logger
-        # 目录创建延迟到首次使用时异步执行
+        # 构造时同步创建一次目录
+        self._ensure_config_directory()
     
-    async def _ensure_config_directory(self):
+    def _ensure_config_directory(self):
         """确保配置目录存在"""
-        await asyncio.to_thread(self.config_file.parent.mkdir, parents=True, exist_ok=True)
+        self.config_file.parent.mkdir(parents=True, exist_ok=True)
     
     async def load_config(self) -> PluginConfig:
         """加载配置"""
-        # 确保配置目录存在
-        await self._ensure_config_directory()
-        if not await aiofiles.os.path.exists(self.config_file):
-            # 创建默认配置
-            default_config = PluginConfig()
-            await self.save_config(default_config)
-            return default_config
-        
+        # 直接读取，文件不存在时再创建默认配置，省去单独的存在性检查
         try:
-            async with aiofiles.open(str(self.config_file), 'r', encoding='utf-8') as f:
-                content = await f.read()
-                data = await asyncio.to_thread(json.loads, content)
+            data = await asyncio.to_thread(read_json_sync, self.config_file)
             
             # 转换为PluginConfig对象
             return PluginConfig.from_dict(data)
             
+        except FileNotFoundError:
+            # 创建默认配置
+            default_config = PluginConfig()
+            await self.save_config(default_config)
+            return default_config
         except (IOError, json.JSONDecodeError) as e:
             self.logger.error(f"读取配置文件失败: {e}")
             # 返回默认配置
@@ -196,9 +211,7 @@ class ConfigManager:
         try:
             data = config.to_dict()
             
-            json_content = await asyncio.to_thread(json.dumps, data, ensure_ascii=False, indent=2)
-            async with aiofiles.open(str(self.config_file), 'w', encoding='utf-8') as f:
-                await f.write(json_content)
+            await asyncio.to_thread(write_json_sync, self.config_file, data, sync_dir=True)
             
             return True
             
@@ -210,51 +223,70 @@ class ConfigManager:
 class PluginCache:
     """插件缓存管理器
     
-    统一管理所有 TTLCache 实例（数据、配置、图片等）。
+    统一管理群组数据、图片和群名称的缓存实例。插件配置只有一份，由 DataManager 自行缓存。
+    群名称缓存由命令处理和定时推送共用（二者持有同一个 DataManager），同一个群只请求一次。
     """
     
-    def __init__(self, data_cache_maxsize=DATA_CACHE_MAXSIZE, data_cache_ttl=DATA_CACHE_TTL, 
-                 config_cache_maxsize=CONFIG_CACHE_MAXSIZE, config_cache_ttl=CONFIG_CACHE_TTL, logger=None):
+    def __init__(self, data_cache_maxsize=DATA_CACHE_MAXSIZE, data_cache_ttl=DATA_CACHE_TTL, logger=None):
         self.logger = logger or astrbot_logger
         
         # 缓存设置
         self.data_cache_maxsize = data_cache_maxsize
         self.data_cache_ttl = data_cache_ttl
-        self.config_cache_maxsize = config_cache_maxsize
-        self.config_cache_ttl = config_cache_ttl
         
-        # 创建缓存实例
-        self.data_cache = TTLCache(maxsize=self.data_cache_maxsize, ttl=self.data_cache_ttl)
-        self.config_cache = TTLCache(maxsize=self.config_cache_maxsize, ttl=self.config_cache_ttl)
+        # 创建缓存实例：群组数据和图片分开缓存，各自直接以群组ID/缓存键为键，无需拼接前缀
+        # 群组数据只会经由 DataManager 写入，写入时更新或清除缓存，因此使用不过期的LRU缓存，
+        # 活跃群组常驻内存，冷门群组按LRU淘汰；图片缓存仍按TTL过期
+        self.data_cache = LRUCache(maxsize=self.data_cache_maxsize)
+        self.image_cache = TTLCache(maxsize=self.data_cache_maxsize, ttl=self.data_cache_ttl)
+        
+        # 群名称缓存：成功结果长TTL，失败时的默认名称短TTL
+        self.group_name_cache = TTLCache(maxsize=GROUP_NAME_CACHE_MAXSIZE, ttl=GROUP_NAME_CACHE_TTL)
+        self.group_name_failure_cache = TTLCache(maxsize=GROUP_NAME_CACHE_MAXSIZE, ttl=GROUP_NAME_FAILURE_TTL)
+    
+    def get_group_name(self, group_id: str) -> Optional[str]:
+        """获取缓存的群名称（包括短期缓存的默认名称），未缓存时返回None"""
+        return self.group_name_cache.get(group_id) or self.group_name_failure_cache.get(group_id)
+    
+    def set_group_name(self, group_id: str, group_name: str):
+        """缓存群名称，获取失败时的默认名称 "群{group_id}" 只短期缓存
+        
+        Args:
+            group_id (str): 群组ID
+            group_name (str): 群名称
+        """
+        if group_name == f"群{group_id}":
+            self.group_name_failure_cache[group_id] = group_name
+        else:
+            self.group_name_cache[group_id] = group_name
     
     def get_data_cache(self):
         """获取数据缓存"""
         return self.data_cache
     
-    def get_config_cache(self):
-        """获取配置缓存"""
-        return self.config_cache
+    def get_image_cache(self):
+        """获取图片缓存"""
+        return self.image_cache
     
     def clear_all_caches(self):
         """清理所有缓存"""
         self.data_cache.clear()
-        self.config_cache.clear()
+        self.image_cache.clear()
         self.logger.info("所有缓存已清理")
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息
         
-        注意：TTLCache 不支持 hits/misses 统计，只返回基本统计信息。
+        注意：cachetools 缓存不支持 hits/misses 统计，只返回基本统计信息。
         """
         return {
             'data_cache': {
                 'size': len(self.data_cache),
-                'maxsize': self.data_cache.maxsize,
-                'ttl': self.data_cache.ttl
+                'maxsize': self.data_cache.maxsize
             },
-            'config_cache': {
-                'size': len(self.config_cache),
-                'maxsize': self.config_cache.maxsize,
-                'ttl': self.config_cache.ttl
+            'image_cache': {
+                'size': len(self.image_cache),
+                'maxsize': self.image_cache.maxsize,
+                'ttl': self.image_cache.ttl
             }
         }
\ No newline at end of file
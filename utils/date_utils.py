@@ -3,7 +3,7 @@
 提供日期处理和计算功能
 """
 
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
 from typing import Optional
 from .models import MessageDate
 
@@ -21,8 +21,7 @@ def get_current_date() -> MessageDate:
         >>> print(today.year, today.month, today.day)
         2024 1 15
     """
-    now = datetime.now()
-    return MessageDate.from_datetime(now)
+    return MessageDate.from_date(date.today())
 
 
 def get_week_start(date_obj: date) -> date:
@@ -5,16 +5,132 @@
 
 import json
 import asyncio
-import aiofiles
-import aiofiles.os
+import os
+import tempfile
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict
 
 
 # 文件操作常量
 JSON_INDENT = 2
+JSON_COMPACT_SEPARATORS = (',', ':')
 ENCODING_UTF8 = 'utf-8'
 
+# JSON序列化：优先使用orjson（序列化快2-5倍，反序列化快2-3倍），未安装时回退到标准库
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方捕获 json.JSONDecodeError 即可
+try:
+    import orjson
+
+    # 非字符串键按标准库行为转为字符串，避免 orjson 直接报错
+    _ORJSON_COMPACT_OPTIONS = orjson.OPT_NON_STR_KEYS
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | _ORJSON_COMPACT_OPTIONS
+
+    def json_dumps_bytes(data: Any, compact: bool = False) -> bytes:
+        """序列化为UTF-8编码的JSON字节串（保留中文，默认缩进2格，compact 为 True 时输出紧凑格式）"""
+        return orjson.dumps(data, option=_ORJSON_COMPACT_OPTIONS if compact else _ORJSON_OPTIONS)
+
+    def json_dumps(data: Any) -> str:
+        """序列化为JSON字符串（保留中文，缩进2格）"""
+        return json_dumps_bytes(data).decode(ENCODING_UTF8)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(data: Any) -> str:
+        """序列化为JSON字符串（保留中文，缩进2格）"""
+        return json.dumps(data, ensure_ascii=False, indent=JSON_INDENT)
+
+    def json_dumps_bytes(data: Any, compact: bool = False) -> bytes:
+        """序列化为UTF-8编码的JSON字节串（保留中文，默认缩进2格，compact 为 True 时输出紧凑格式）"""
+        if compact:
+            return json.dumps(data, ensure_ascii=False, separators=JSON_COMPACT_SEPARATORS).encode(ENCODING_UTF8)
+        return json.dumps(data, ensure_ascii=False, indent=JSON_INDENT).encode(ENCODING_UTF8)
+
+    json_loads = json.loads
+
+
+def read_json_sync(file_path: Path) -> Any:
+    """同步读取并解析JSON文件
+    
+    读取和解析在同一个函数内完成，调用方用 asyncio.to_thread 包一层，
+    整个过程只需一次线程切换。
+    
+    Args:
+        file_path (Path): JSON文件路径
+        
+    Returns:
+        Any: 解析后的JSON数据
+        
+    Raises:
+        FileNotFoundError: 当文件不存在时抛出
+        json.JSONDecodeError: 当文件内容不是有效JSON时抛出
+    """
+    return json_loads(Path(file_path).read_bytes())
+
+
+def write_json_sync(file_path: Path, data: Any, compact: bool = False, sync_dir: bool = False) -> None:
+    """同步原子写入JSON文件
+    
+    先写入同目录下的唯一临时文件并 fsync，再用 os.replace 替换目标文件，
+    写入中途失败或掉电都不会留下半截的目标文件。每次写入使用各自的临时文件，
+    同一文件的并发保存不会写进同一个临时文件，最后替换的一方完整生效。
+    
+    临时文件内容总会在替换前 fsync；目录项只在 sync_dir 为 True 时 fsync。
+    群组数据每个落盘周期都会写入，不刷新目录项，掉电时最多回退到上一版完整文件；
+    配置和群成员快照写入次数少，传入 sync_dir=True 保证替换结果本身也落盘。
+    
+    Args:
+        file_path (Path): 目标文件路径
+        data (Any): 要保存的数据
+        compact (bool): 是否输出不带缩进的紧凑格式
+        sync_dir (bool): 替换后是否 fsync 所在目录，使重命名结果持久化
+        
+    Raises:
+        IOError: 当文件写入失败时抛出
+    """
+    file_path = Path(file_path)
+    payload = json_dumps_bytes(data, compact)
+    fd, temp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f"{file_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            # 替换前先把临时文件刷到磁盘，避免掉电后目标文件变成空文件或半截内容
+            os.fsync(f.fileno())
+        os.replace(temp_name, file_path)
+    except BaseException:
+        # 写入或替换失败时删除临时文件，不在数据目录中留下残留
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+    if sync_dir:
+        _fsync_directory(file_path.parent)
+
+
+def _fsync_directory(dir_path: Path) -> None:
+    """刷新目录项，使 os.replace 的重命名结果持久化
+    
+    仅在支持以 O_DIRECTORY 打开目录的平台（POSIX）上执行，其他平台直接跳过。
+    
+    Args:
+        dir_path (Path): 目录路径
+    """
+    flags = getattr(os, 'O_DIRECTORY', None)
+    if flags is None:
+        return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY | flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # 部分文件系统不支持对目录fsync，此时文件内容已落盘，忽略即可
+        pass
+    finally:
+        os.close(fd)
+
 
 async def load_json_file(file_path: str) -> Dict[str, Any]:
     """异步加载JSON文件
@@ -31,9 +147,8 @@ async def load_json_file(file_path: str) -> Dict[str, Any]:
         IOError: 当文件读取失败时抛出
     """
     try:
-        async with aiofiles.open(file_path, 'r', encoding=ENCODING_UTF8) as f:
-            content = await f.read()
-            return await asyncio.to_thread(json.loads, content)
+        # 直接解析字节内容，省去先解码为字符串的步骤
+        return await asyncio.to_thread(read_json_sync, file_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"文件不存在: {file_path}")
     except json.JSONDecodeError as e:
@@ -44,9 +159,10 @@ async def load_json_file(file_path: str) -> Dict[str, Any]:
 
 async def save_json_file(file_path: str, data: Dict[str, Any]) -> None:
     """异步保存JSON文件，自动创建目录（异步版本）"""
-    # 使用异步方式创建目录
-    await aiofiles.os.makedirs(Path(file_path).parent, exist_ok=True)
-    
-    async with aiofiles.open(file_path, 'w', encoding=ENCODING_UTF8) as f:
-        json_content = await asyncio.to_thread(json.dumps, data, ensure_ascii=False, indent=JSON_INDENT)
-        await f.write(json_content)
\ No newline at end of file
+    await asyncio.to_thread(_save_json_file_sync, Path(file_path), data)
+
+
+def _save_json_file_sync(file_path: Path, data: Dict[str, Any]) -> None:
+    """同步创建目录并原子写入JSON文件，序列化结果直接以字节写出"""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_sync(file_path, data)
\ No newline at end of file
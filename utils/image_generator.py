@@ -41,10 +41,161 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     astrbot_logger.warning("Playwright未安装，图片生成功能将不可用")
 
-from .models import UserData, GroupInfo, PluginConfig
+from .models import RankEntry, GroupInfo, PluginConfig
 from .exception_handlers import safe_generation, safe_file_operation
 
-
+# 默认排行榜模板（使用简单占位符），模块加载时构建一次，模板文件不可用时使用
+DEFAULT_RANK_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+        body {
+            font-family: 'Microsoft YaHei', 'Segoe UI', sans-serif;
+            background: linear-gradient(135deg, #E9EFF6 0%, #D6E4F0 100%);
+            padding: 30px;
+            min-height: 100vh;
+        }
+        .title {
+            text-align: center;
+            font-size: 28px;
+            color: #1F2937;
+            margin-bottom: 25px;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+        }
+        .user-list {
+            max-width: 800px;
+            margin: 0 auto;
+            background: rgba(255,255,255,0.9);
+            border-radius: 12px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            padding: 20px;
+        }
+        .user-item {
+            display: flex;
+            align-items: center;
+            padding: 15px;
+            border-bottom: 1px solid #E5E7EB;
+            transition: transform 0.2s ease;
+            border-radius: 8px;
+            margin-bottom: 8px;
+        }
+        .user-item:hover {
+            transform: translateX(10px);
+            background-color: rgba(59, 130, 246, 0.05);
+        }
+        .user-item-current {
+            display: flex;
+            align-items: center;
+            padding: 15px;
+            border-bottom: 1px solid #E5E7EB;
+            transition: transform 0.2s ease;
+            background: linear-gradient(135deg, #F3E8FF 0%, #EDE9FE 100%);
+            border-radius: 12px;
+            margin-bottom: 8px;
+            box-shadow: 0 2px 4px rgba(139, 92, 246, 0.1);
+        }
+        .user-item-current:hover {
+            transform: translateX(10px);
+            box-shadow: 0 4px 8px rgba(139, 92, 246, 0.2);
+        }
+        .rank {
+            width: 50px;
+            height: 50px;
+            border-radius: 50%;
+            background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%);
+            color: white;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            font-size: 18px;
+            font-weight: bold;
+            margin-right: 20px;
+            box-shadow: 0 2px 4px rgba(59, 130, 246, 0.3);
+            transition: transform 0.2s ease;
+        }
+        .rank:hover {
+            transform: scale(1.1);
+        }
+        .rank-current {
+            width: 50px;
+            height: 50px;
+            border-radius: 50%;
+            background: linear-gradient(135deg, #EF4444 0%, #DC2626 100%);
+            color: white;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            font-size: 18px;
+            font-weight: bold;
+            margin-right: 20px;
+            box-shadow: 0 2px 4px rgba(239, 68, 68, 0.3);
+            transition: transform 0.2s ease;
+        }
+        .rank-current:hover {
+            transform: scale(1.1);
+        }
+        .avatar {
+            width: 60px;
+            height: 60px;
+            border-radius: 50%;
+            margin: 0 20px;
+            border: 3px solid #3B82F6;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .info {
+            flex: 1;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        .name-date {
+            display: flex;
+            flex-direction: column;
+        }
+        .nickname {
+            font-size: 20px;
+            color: #1F2937;
+            font-weight: 500;
+            line-height: 1.2;
+        }
+        .date {
+            color: #6B7280;
+            font-size: 14px;
+            margin-top: 4px;
+        }
+        .stats {
+            text-align: right;
+            font-size: 18px;
+            min-width: 120px;
+        }
+        .count {
+            color: #EF4444;
+            font-weight: bold;
+        }
+        .percentage {
+            color: #22C55E;
+            font-size: 16px;
+        }
+    </style>
+</head>
+<body>
+    <div class="title">{{ group_name }}[{{ group_id }}]</div>
+    <div class="title">{{ title }}</div>
+    <div class="user-list">
+        {{ user_items }}
+    </div>
+</body>
+</html>
+"""
 
 
 class ImageGenerationError(Exception):
@@ -325,7 +476,7 @@ class ImageGenerator:
     
     @safe_generation(default_return=None)
     async def generate_rank_image(self, 
-                                 users: List[UserData], 
+                                 users: List[RankEntry], 
                                  group_info: GroupInfo, 
                                  title: str,
                                  current_user_id: Optional[str] = None) -> str:
@@ -389,7 +540,7 @@ class ImageGenerator:
     
     @safe_generation(default_return="")
     async def _generate_html(self, 
-                      users: List[UserData], 
+                      users: List[RankEntry], 
                       group_info: GroupInfo, 
                       title: str,
                       current_user_id: Optional[str] = None) -> str:
@@ -422,13 +573,13 @@ class ImageGenerator:
         # 生成HTML内容（优化渲染逻辑）
         return await self._render_html_template(html_template, template_data, processed_data['user_items'])
     
-    def _process_user_data_batch(self, users: List[UserData], current_user_id: Optional[str]) -> Dict[str, Any]:
+    def _process_user_data_batch(self, users: List[RankEntry], current_user_id: Optional[str]) -> Dict[str, Any]:
         """批量处理用户数据，优化性能"""
         if not users:
             return {'total_messages': 0, 'user_items': []}
         
         # 预计算统计数据 - 使用时间段内的发言数
-        total_messages = sum(getattr(user, 'display_total', user.message_count) for user in users)
+        total_messages = sum(user.display_total for user in users)
         
         # 批量生成用户项目
         user_items = []
@@ -441,7 +592,7 @@ class ImageGenerator:
                 current_user_found = True
             
             # 使用时间段内的发言数
-            user_messages = getattr(user, 'display_total', user.message_count)
+            user_messages = user.display_total
             user_items.append({
                 'rank': i + 1,
                 'nickname': user.nickname,
@@ -458,8 +609,8 @@ class ImageGenerator:
             current_user_data = next((user for user in users if user.user_id == current_user_id), None)
             if current_user_data:
                 # 使用时间段内的发言数计算排名
-                current_user_messages = getattr(current_user_data, 'display_total', current_user_data.message_count)
-                current_rank = sum(1 for user in users if getattr(user, 'display_total', user.message_count) > current_user_messages) + 1
+                current_user_messages = current_user_data.display_total
+                current_rank = sum(1 for user in users if user.display_total > current_user_messages) + 1
                 user_items.append({
                     'rank': current_rank,
                     'nickname': current_user_data.nickname,
@@ -1052,158 +1203,7 @@ class ImageGenerator:
         if cached_default:
             return cached_default['content']
         
-        # 创建优化的默认模板（使用简单占位符）
-        default_template = """
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ title }}</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        body {
-            font-family: 'Microsoft YaHei', 'Segoe UI', sans-serif;
-            background: linear-gradient(135deg, #E9EFF6 0%, #D6E4F0 100%);
-            padding: 30px;
-            min-height: 100vh;
-        }
-        .title {
-            text-align: center;
-            font-size: 28px;
-            color: #1F2937;
-            margin-bottom: 25px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-        }
-        .user-list {
-            max-width: 800px;
-            margin: 0 auto;
-            background: rgba(255,255,255,0.9);
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            padding: 20px;
-        }
-        .user-item {
-            display: flex;
-            align-items: center;
-            padding: 15px;
-            border-bottom: 1px solid #E5E7EB;
-            transition: transform 0.2s ease;
-            border-radius: 8px;
-            margin-bottom: 8px;
-        }
-        .user-item:hover {
-            transform: translateX(10px);
-            background-color: rgba(59, 130, 246, 0.05);
-        }
-        .user-item-current {
-            display: flex;
-            align-items: center;
-            padding: 15px;
-            border-bottom: 1px solid #E5E7EB;
-            transition: transform 0.2s ease;
-            background: linear-gradient(135deg, #F3E8FF 0%, #EDE9FE 100%);
-            border-radius: 12px;
-            margin-bottom: 8px;
-            box-shadow: 0 2px 4px rgba(139, 92, 246, 0.1);
-        }
-        .user-item-current:hover {
-            transform: translateX(10px);
-            box-shadow: 0 4px 8px rgba(139, 92, 246, 0.2);
-        }
-        .rank {
-            width: 50px;
-            height: 50px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%);
-            color: white;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 18px;
-            font-weight: bold;
-            margin-right: 20px;
-            box-shadow: 0 2px 4px rgba(59, 130, 246, 0.3);
-            transition: transform 0.2s ease;
-        }
-        .rank:hover {
-            transform: scale(1.1);
-        }
-        .rank-current {
-            width: 50px;
-            height: 50px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, #EF4444 0%, #DC2626 100%);
-            color: white;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 18px;
-            font-weight: bold;
-            margin-right: 20px;
-            box-shadow: 0 2px 4px rgba(239, 68, 68, 0.3);
-            transition: transform 0.2s ease;
-        }
-        .rank-current:hover {
-            transform: scale(1.1);
-        }
-        .avatar {
-            width: 60px;
-            height: 60px;
-            border-radius: 50%;
-            margin: 0 20px;
-            border: 3px solid #3B82F6;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        .info {
-            flex: 1;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .name-date {
-            display: flex;
-            flex-direction: column;
-        }
-        .nickname {
-            font-size: 20px;
-            color: #1F2937;
-            font-weight: 500;
-            line-height: 1.2;
-        }
-        .date {
-            color: #6B7280;
-            font-size: 14px;
-            margin-top: 4px;
-        }
-        .stats {
-            text-align: right;
-            font-size: 18px;
-            min-width: 120px;
-        }
-        .count {
-            color: #EF4444;
-            font-weight: bold;
-        }
-        .percentage {
-            color: #22C55E;
-            font-size: 16px;
-        }
-    </style>
-</head>
-<body>
-    <div class="title">{{ group_name }}[{{ group_id }}]</div>
-    <div class="title">{{ title }}</div>
-    <div class="user-list">
-        {{ user_items }}
-    </div>
-</body>
-</html>
-"""
+        default_template = DEFAULT_RANK_TEMPLATE
         
         # 缓存默认模板
         async with self._cache_lock:
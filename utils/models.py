@@ -8,9 +8,11 @@
 - date_utils: 日期时间处理工具
 """
 
+import functools
+import operator
 from dataclasses import dataclass, field
-from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
 
 # 使用框架的日志记录器 - 使用可选导入避免测试环境问题
@@ -45,7 +47,72 @@ class RankType(Enum):
     MONTHLY = "monthly"
 
 
-@dataclass
+# 排行榜标题模板，按 year/month/day/week 填充当前日期
+RANK_TITLE_TEMPLATES = {
+    RankType.TOTAL: "总发言排行榜",
+    RankType.DAILY: "今日[{year}年{month}月{day}日]发言榜单",
+    RankType.WEEKLY: "本周[{year}年{month}月第{week}周]发言榜单",
+    RankType.MONTHLY: "本月[{year}年{month}月]发言榜单",
+}
+DEFAULT_RANK_TITLE = "发言榜单"
+
+
+def format_rank_title(rank_type: 'RankType', now: datetime) -> str:
+    """按排行榜类型生成标题
+    
+    指令和定时推送共用，周数统一使用ISO周（isocalendar）。标题只取决于日期，
+    按 (排行榜类型, 日期) 缓存，跨天后键变化自动重新生成。
+    
+    Args:
+        rank_type (RankType): 排行榜类型
+        now (datetime): 当前时间
+        
+    Returns:
+        str: 排行榜标题，未知类型返回默认标题
+        
+    Example:
+        >>> format_rank_title(RankType.MONTHLY, datetime(2024, 1, 15))
+        '本月[2024年1月]发言榜单'
+    """
+    return _compute_title(rank_type, now.date())
+
+
+@functools.lru_cache(maxsize=8)
+def _compute_title(rank_type: 'RankType', current: date) -> str:
+    """生成指定日期的排行榜标题（带缓存）
+    
+    Args:
+        rank_type (RankType): 排行榜类型
+        current (date): 当前日期
+        
+    Returns:
+        str: 排行榜标题，未知类型返回默认标题
+    """
+    template = RANK_TITLE_TEMPLATES.get(rank_type)
+    if template is None:
+        return DEFAULT_RANK_TITLE
+    return template.format(year=current.year, month=current.month, day=current.day,
+                           week=current.isocalendar().week)
+
+
+@functools.lru_cache(maxsize=8)
+def _period_bounds(current: date) -> Tuple[str, str, str]:
+    """计算当前日期、本周起始日期和本月起始日期的ISO字符串
+    
+    ISO日期字符串可以直接按字典序比较，排行榜筛选时每个用户只需做字符串比较，
+    无需解析统计日期；同一天内的结果被缓存，所有用户共享。
+    
+    Args:
+        current (date): 当前日期
+        
+    Returns:
+        Tuple[str, str, str]: (当前日期, 本周一, 本月1日) 的ISO字符串
+    """
+    week_start = current - timedelta(days=current.weekday())
+    return current.isoformat(), week_start.isoformat(), current.replace(day=1).isoformat()
+
+
+@dataclass(slots=True)
 class MessageDate:
     """消息日期记录
     
@@ -164,7 +231,7 @@ class MessageDate:
         return (self.year, self.month, self.day) < (other.year, other.month, other.day)
 
 
-@dataclass
+@dataclass(slots=True)
 class UserData:
     """用户数据
     
@@ -179,11 +246,19 @@ class UserData:
         last_date (Optional[str]): 最后发言日期的字符串表示
         first_message_time (Optional[int]): 首次发言时间戳
         last_message_time (Optional[int]): 最后发言时间戳
+        today_count (int): last_count_date 当天的发言次数
+        week_count (int): last_count_date 所在周的发言次数
+        month_count (int): last_count_date 所在月的发言次数
+        last_count_date (Optional[str]): 周期计数对应的日期（YYYY-MM-DD）
         
     Methods:
         add_message(): 添加新的消息记录
         get_last_message_date(): 获取最后发言日期
         get_message_count_in_period(): 获取指定时间段内的发言数量
+        get_period_count(): 获取日/周/月榜的发言数量（使用预聚合计数）
+        rebuild_period_counts(): 从历史记录重建周期计数
+        checkpoint(): 记录当前统计状态
+        rollback(): 恢复到 checkpoint() 记录的状态
         to_dict(): 转换为字典格式
         from_dict(): 从字典创建实例
         
@@ -201,6 +276,16 @@ class UserData:
     first_message_time: Optional[int] = None
     last_message_time: Optional[int] = None
     
+    # 按周期预聚合的发言计数，随add_message增量维护，排行时无需遍历history
+    today_count: int = 0
+    week_count: int = 0
+    month_count: int = 0
+    last_count_date: Optional[str] = None
+    
+    # history 的字符串形式缓存。history 只会追加，保存时只需转换新增部分；
+    # 缓存的列表生成后不再修改，更新时整体替换为新列表
+    _history_strs: List[str] = field(default_factory=list, init=False, repr=False, compare=False)
+    
     def add_message(self, message_date: MessageDate):
         """添加消息记录
         
@@ -219,14 +304,204 @@ class UserData:
             >>> print(user.message_count)
             1
         """
-        self.message_count += 1
+        self.add_messages(message_date, 1)
+    
+    def add_messages(self, message_date: MessageDate, count: int):
+        """批量添加同一天的消息记录
         
-        # 每次发言都添加到历史记录中
-        self.history.append(message_date)
+        与调用 count 次 add_message 结果相同，但日期解析和周期滚动只做一次，
+        用于批量落盘时一次性应用聚合的发言计数。
         
-        # 更新最后发言日期
+        Args:
+            message_date (MessageDate): 消息日期对象
+            count (int): 消息数量
+            
+        Returns:
+            None: 无返回值，直接修改对象状态
+            
+        Example:
+            >>> user = UserData("123", "用户")
+            >>> user.add_messages(MessageDate(2024, 1, 15), 3)
+            >>> print(user.message_count, user.today_count)
+            3 3
+        """
+        if count <= 0:
+            return
+        
+        current = message_date.to_date()
+        last_count = date.fromisoformat(self.last_count_date) if self.last_count_date else None
+        
+        if last_count is not None and current < last_count:
+            # 补录早于统计日期的消息：记录后按原统计日期重建周期计数
+            self._append_history(message_date, count)
+            self.rebuild_period_counts(last_count)
+            return
+        
+        # 跨日/周/月时先滚动周期计数（可能从历史重建，需在记录新消息之前），再增量更新
+        self._roll_period_counts(current)
+        self._append_history(message_date, count)
+        self.today_count += count
+        self.week_count += count
+        self.month_count += count
+    
+    def _append_history(self, message_date: MessageDate, count: int):
+        """记录 count 条同一天的发言到历史中，并更新总发言数和最后发言日期"""
+        self.message_count += count
+        self.history.extend([message_date] * count)
         self.last_date = str(message_date)
     
+    def _roll_period_counts(self, current: date):
+        """将周期计数滚动到指定日期
+        
+        跨日时清零日计数，跨周、跨月时分别清零周计数和月计数。
+        没有统计日期（旧数据）或日期回退时从历史记录重建。
+        
+        Args:
+            current (date): 新的统计日期
+        """
+        if not self.last_count_date:
+            self.rebuild_period_counts(current)
+            return
+        
+        last = date.fromisoformat(self.last_count_date)
+        if last == current:
+            return
+        if last > current:
+            self.rebuild_period_counts(current)
+            return
+        
+        self.today_count = 0
+        if last - timedelta(days=last.weekday()) != current - timedelta(days=current.weekday()):
+            self.week_count = 0
+        if (last.year, last.month) != (current.year, current.month):
+            self.month_count = 0
+        self.last_count_date = current.isoformat()
+    
+    def rebuild_period_counts(self, current: date):
+        """从历史记录重建周期计数
+        
+        用于没有预聚合计数的旧数据，或统计日期异常时的校正。
+        
+        Args:
+            current (date): 统计日期
+            
+        Example:
+            >>> user = UserData("123", "用户", history=[MessageDate(2024, 1, 15)])
+            >>> user.rebuild_period_counts(date(2024, 1, 15))
+            >>> print(user.today_count, user.week_count, user.month_count)
+            1 1 1
+        """
+        week_start = current - timedelta(days=current.weekday())
+        week_start = (week_start.year, week_start.month, week_start.day)
+        month_start = (current.year, current.month, 1)
+        today = (current.year, current.month, current.day)
+        today_count = week_count = month_count = 0
+        
+        # 按 (年, 月, 日) 元组比较，避免为每条历史记录构造date对象
+        for hist_date in self.history:
+            hist = (hist_date.year, hist_date.month, hist_date.day)
+            if hist > today:
+                continue
+            if hist == today:
+                today_count += 1
+            if hist >= week_start:
+                week_count += 1
+            if hist >= month_start:
+                month_count += 1
+        
+        self.today_count = today_count
+        self.week_count = week_count
+        self.month_count = month_count
+        self.last_count_date = current.isoformat()
+    
+    def checkpoint(self) -> Tuple:
+        """记录当前统计状态，供写入失败时撤销之后的 add_messages
+        
+        history 只会追加，只需记录其长度；其余字段都是不可变的标量。
+        
+        Returns:
+            Tuple: 状态快照，只用于传给 rollback()
+        """
+        return (
+            self.nickname, self.message_count, self.last_date,
+            self.first_message_time, self.last_message_time,
+            self.today_count, self.week_count, self.month_count, self.last_count_date,
+            len(self.history),
+        )
+    
+    def rollback(self, state: Tuple):
+        """恢复到 checkpoint() 记录的状态
+        
+        Args:
+            state (Tuple): checkpoint() 的返回值
+            
+        Example:
+            >>> user = UserData("123", "用户")
+            >>> state = user.checkpoint()
+            >>> user.add_message(MessageDate(2024, 1, 15))
+            >>> user.rollback(state)
+            >>> print(user.message_count, len(user.history))
+            0 0
+        """
+        (
+            self.nickname, self.message_count, self.last_date,
+            self.first_message_time, self.last_message_time,
+            self.today_count, self.week_count, self.month_count, self.last_count_date,
+            history_len,
+        ) = state
+        del self.history[history_len:]
+        # 字符串缓存同步截断，避免之后追加的记录误用被撤销记录的缓存
+        if len(self._history_strs) > history_len:
+            self._history_strs = self._history_strs[:history_len]
+    
+    def get_period_count(self, rank_type: 'RankType', current: date) -> int:
+        """获取排行榜类型对应时间段内的发言数量
+        
+        直接使用预聚合的周期计数，统计日期已过期的周期视为0，
+        不需要遍历history，也不解析日期，只做ISO字符串比较。
+        
+        Args:
+            rank_type (RankType): 排行榜类型
+            current (date): 当前日期
+            
+        Returns:
+            int: 对应时间段内的发言次数
+            
+        Example:
+            >>> user = UserData("123", "用户")
+            >>> user.add_message(MessageDate(2024, 1, 15))
+            >>> user.get_period_count(RankType.DAILY, date(2024, 1, 16))
+            0
+            >>> user.get_period_count(RankType.WEEKLY, date(2024, 1, 16))
+            1
+        """
+        if rank_type == RankType.TOTAL:
+            return self.message_count
+        
+        if not self.last_count_date:
+            self.rebuild_period_counts(current)
+        last = self.last_count_date
+        today, week_start, month_start = _period_bounds(current)
+        
+        if last > today:
+            # 统计日期晚于查询日期（如系统时间回退），退回按历史记录计算
+            if rank_type == RankType.DAILY:
+                start = today
+            elif rank_type == RankType.WEEKLY:
+                start = week_start
+            else:
+                start = month_start
+            return self.get_message_count_in_period(date.fromisoformat(start), current)
+        
+        # 统计日期不晚于今天，不早于周期起始日即属于同一周期（ISO字符串直接比较）
+        if rank_type == RankType.DAILY:
+            return self.today_count if last == today else 0
+        if rank_type == RankType.WEEKLY:
+            return self.week_count if last >= week_start else 0
+        if rank_type == RankType.MONTHLY:
+            return self.month_count if last >= month_start else 0
+        return 0
+    
     def get_last_message_date(self) -> Optional[MessageDate]:
         """获取最后消息日期
         
@@ -264,16 +539,16 @@ class UserData:
             >>> print(count)
             2
         """
-        count = 0
-        for hist_date in self.history:
-            if start_date <= hist_date.to_date() <= end_date:
-                count += 1
-        return count
+        # 按 (年, 月, 日) 元组比较，避免为每条历史记录构造date对象
+        start = (start_date.year, start_date.month, start_date.day)
+        end = (end_date.year, end_date.month, end_date.day)
+        return sum(1 for h in self.history if start <= (h.year, h.month, h.day) <= end)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典
         
         将UserData实例转换为字典格式，便于JSON序列化。
+        返回的 history 列表与内部缓存共享，调用方不应修改。
         
         Returns:
             Dict[str, Any]: 包含用户数据的字典，包括：
@@ -284,6 +559,8 @@ class UserData:
                 - last_date: 最后发言日期
                 - first_message_time: 首次发言时间戳
                 - last_message_time: 最后发言时间戳
+                - today_count/week_count/month_count: 周期发言计数
+                - last_count_date: 周期计数对应的日期
                 
         Example:
             >>> user = UserData("123", "用户")
@@ -295,12 +572,38 @@ class UserData:
             "user_id": self.user_id,
             "nickname": self.nickname,
             "message_count": self.message_count,
-            "history": [str(h) for h in self.history],
+            "history": self._serialize_history(),
             "last_date": self.last_date,
             "first_message_time": self.first_message_time,
-            "last_message_time": self.last_message_time
+            "last_message_time": self.last_message_time,
+            "today_count": self.today_count,
+            "week_count": self.week_count,
+            "month_count": self.month_count,
+            "last_count_date": self.last_count_date
         }
     
+    def _serialize_history(self) -> List[str]:
+        """返回history的字符串列表
+        
+        复用上次保存时的转换结果，只对之后追加的记录调用str()。
+        history 没有变化时直接返回缓存的列表，不做任何复制；有新增记录时
+        由缓存前缀和新增部分拼出新列表，再一次性替换缓存，已返回的列表不会被修改，
+        同一用户被多次序列化时也不会重复追加。
+        
+        Returns:
+            List[str]: 发言日期历史的字符串列表（与缓存共享，调用方不应修改）
+        """
+        cached = self._history_strs
+        history_len = len(self.history)
+        if len(cached) == history_len:
+            return cached
+        if len(cached) > history_len:
+            # 历史记录被缩短时缓存失效，重新全部转换
+            cached = []
+        serialized = cached + [str(h) for h in self.history[len(cached):]]
+        self._history_strs = serialized
+        return serialized
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'UserData':
         """从字典创建
@@ -329,7 +632,11 @@ class UserData:
             message_count=data.get("message_count", 0),
             last_date=data.get("last_date"),
             first_message_time=data.get("first_message_time"),
-            last_message_time=data.get("last_message_time")
+            last_message_time=data.get("last_message_time"),
+            today_count=data.get("today_count", 0),
+            week_count=data.get("week_count", 0),
+            month_count=data.get("month_count", 0),
+            last_count_date=data.get("last_count_date")
         )
         
         # 重建history
@@ -348,6 +655,10 @@ class UserData:
                 logger.warning(f"history字段类型错误，不是可迭代对象: {type(data.get('history'))}, 错误: {e}")
                 # 不使用pass，而是记录具体的错误信息
         
+        # 旧数据没有周期计数，从历史记录重建一次（保存后即持久化）
+        if not user_data.last_count_date:
+            user_data.rebuild_period_counts(date.today())
+        
         return user_data
     
     def __lt__(self, other) -> bool:
@@ -526,6 +837,36 @@ class GroupInfo:
         }
 
 
+@dataclass(slots=True)
+class RankEntry:
+    """排行榜条目
+    
+    排行榜渲染只需要的轻量用户视图，筛选时由 UserData 构建，
+    不复制发言历史，也不会修改缓存中共享的用户对象。
+    
+    Attributes:
+        user_id (str): 用户唯一标识符
+        nickname (str): 用户昵称
+        message_count (int): 总发言数
+        display_total (int): 排行榜对应时间段内的发言数
+        last_date (Optional[str]): 最后发言日期的字符串表示
+        
+    Example:
+        >>> entry = RankEntry("123456789", "用户昵称", 100, 5)
+        >>> print(entry.display_total)
+        5
+    """
+    user_id: str
+    nickname: str
+    message_count: int
+    display_total: int
+    last_date: Optional[str] = None
+
+
+# 排行榜条目按时间段发言数排序的键（C实现的属性访问），命令和定时推送共用
+DISPLAY_TOTAL_KEY = operator.attrgetter('display_total')
+
+
 @dataclass
 class RankData:
     """排行榜数据
@@ -10,8 +10,8 @@
 """
 
 import asyncio
+import heapq
 import re
-import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from enum import Enum
@@ -23,11 +23,21 @@ from astrbot.api.event import AstrMessageEvent, MessageChain, filter
 # PlatformAdapterType 在 astrbot.api.event.filter 中
 # 移除消息组件导入，使用MessageChain
 
-from .models import RankType, UserData, GroupInfo
+from .models import RankType, UserData, GroupInfo, RankEntry, format_rank_title, DISPLAY_TOTAL_KEY
 from .data_manager import DataManager
 from .image_generator import ImageGenerator
-from .date_utils import get_current_date, get_week_start, get_month_start
 from .exception_handlers import safe_timer_operation, safe_generation, safe_data_operation
+from .file_utils import json_loads
+
+# 定时推送配置中的排行榜类型字符串到枚举的映射
+RANK_TYPE_MAPPING = {
+    'total': RankType.TOTAL,
+    'daily': RankType.DAILY,
+    'week': RankType.WEEKLY,
+    'weekly': RankType.WEEKLY,
+    'month': RankType.MONTHLY,
+    'monthly': RankType.MONTHLY
+}
 
 
 class TimerTaskStatus(Enum):
@@ -470,7 +480,25 @@ class TimerManager:
             return False
     
     async def _get_group_name(self, group_id: str) -> str:
-        """获取群组名称
+        """获取群组名称（带缓存，与命令处理共用数据管理器中的群名称缓存）
+        
+        Args:
+            group_id: 群组ID
+            
+        Returns:
+            str: 群组名称，如果获取失败则返回默认格式
+        """
+        cache_manager = self.data_manager.cache_manager
+        group_name = cache_manager.get_group_name(group_id)
+        if group_name:
+            return group_name
+        
+        group_name = await self._fetch_group_name(group_id)
+        cache_manager.set_group_name(group_id, group_name)
+        return group_name
+    
+    async def _fetch_group_name(self, group_id: str) -> str:
+        """从群组数据文件或API获取群组名称
         
         Args:
             group_id: 群组ID
@@ -486,7 +514,7 @@ class TimerManager:
                 async with aiofiles.open(group_file_path, 'r', encoding='utf-8') as f:
                     content = await f.read()
                     if content.strip():
-                        data = json.loads(content)
+                        data = json_loads(content)
                         # 尝试从用户数据中推断群组名称
                         if isinstance(data, list) and len(data) > 0:
                             # 从第一个用户的数据中尝试获取群组信息
@@ -559,24 +587,16 @@ class TimerManager:
         rank_type = RankType.DAILY
         self.logger.info(f"群组 {group_id} 定时推送使用今日排行榜")
         
-        filtered_data = await self._filter_data_by_rank_type(group_data, rank_type)
+        # 当前时间只取一次，筛选和标题共用同一个时间点
+        now = datetime.now()
+        
+        filtered_data = await self._filter_data_by_rank_type(group_data, rank_type, now)
         if not filtered_data:
             self.logger.warning(f"群组 {group_id} 没有符合条件的用户数据")
             return False
         
-        # 排序数据
-        filtered_data.sort(key=lambda x: x[1], reverse=True)
-        
-        # 限制数量
-        limited_data = filtered_data[:config.rand]
-        users_for_rank = []
-        
-        # 为用户数据设置display_total属性，确保图片生成器使用正确的数据
-        # 修复：图片版排行榜显示昨日数据的问题
-        for user_data, count in limited_data:
-            # 设置display_total属性（时间段内的发言数）
-            user_data.display_total = count
-            users_for_rank.append(user_data)
+        # 按时间段发言数取前N名（筛选结果已带display_total，图片生成器直接使用）
+        users_for_rank = heapq.nlargest(config.rand, filtered_data, key=DISPLAY_TOTAL_KEY)
         
         # 创建群组信息
         group_info = GroupInfo(group_id=str(group_id))
@@ -585,7 +605,7 @@ class TimerManager:
         group_info.group_name = group_name
         
         # 生成标题
-        title = self._generate_title(rank_type)
+        title = self._generate_title(rank_type, now)
         
         # 定时推送只发送图片版本
         image_path = await self._generate_rank_image(users_for_rank, group_info, title, config)
@@ -606,7 +626,7 @@ class TimerManager:
         return success
     
     @safe_generation(default_return=None)
-    async def _generate_rank_image(self, users: List[UserData], group_info: GroupInfo, title: str, config) -> Optional[str]:
+    async def _generate_rank_image(self, users: List[RankEntry], group_info: GroupInfo, title: str, config) -> Optional[str]:
         """生成排行榜图片
         
         Args:
@@ -752,50 +772,38 @@ class TimerManager:
         Raises:
             ValueError: 当类型字符串无效时抛出
         """
-        rank_type_mapping = {
-            'total': RankType.TOTAL,
-            'daily': RankType.DAILY,
-            'week': RankType.WEEKLY,
-            'weekly': RankType.WEEKLY,
-            'month': RankType.MONTHLY,
-            'monthly': RankType.MONTHLY
-        }
-        
         rank_type_str = rank_type_str.lower()
-        if rank_type_str in rank_type_mapping:
-            return rank_type_mapping[rank_type_str]
-        else:
+        rank_type = RANK_TYPE_MAPPING.get(rank_type_str)
+        if rank_type is None:
             raise ValueError(f"无效的排行榜类型: {rank_type_str}")
+        return rank_type
     
-    async def _filter_data_by_rank_type(self, group_data: List[UserData], rank_type: RankType) -> List[tuple]:
+    async def _filter_data_by_rank_type(self, group_data: List[UserData], rank_type: RankType, now: datetime) -> List[RankEntry]:
         """根据排行榜类型筛选数据
         
+        返回轻量的 RankEntry 列表，display_total 为时间段内的发言数，
+        不复制发言历史，也不修改缓存中共享的用户对象。
+        
         Args:
             group_data: 群组用户数据
             rank_type: 排行榜类型
+            now: 当前时间，由调用方取一次后传入
             
         Returns:
-            List[tuple]: 筛选后的数据，格式为[(UserData, count)]
+            List[RankEntry]: 排行榜条目列表，已过滤未发言用户
         """
         try:
-            current_date = get_current_date().to_date()
-            
-            if rank_type == RankType.TOTAL:
-                # 总榜：返回每个用户及其总发言数的元组，但过滤掉从未发言的用户
-                return [(user, user.message_count) for user in group_data if user.message_count > 0]
+            current_date = now.date()
             
-            # 时间段过滤
+            # 使用预聚合的周期计数（总榜即总发言数），无需遍历历史记录
             filtered_users = []
+            # 循环内用到的全局名和绑定方法先取到局部变量
+            append = filtered_users.append
+            entry = RankEntry
             for user in group_data:
-                if not user.history:
-                    continue
-                
-                # 计算指定时间段的发言次数
-                period_count = user.get_message_count_in_period(
-                    *self._get_time_period_for_rank_type(rank_type, current_date)
-                )
+                period_count = user.get_period_count(rank_type, current_date)
                 if period_count > 0:
-                    filtered_users.append((user, period_count))
+                    append(entry(user.user_id, user.nickname, user.message_count, period_count, user.last_date))
             
             return filtered_users
             
@@ -803,53 +811,17 @@ class TimerManager:
             self.logger.error(f"筛选数据时发生错误: {e}")
             return []
     
-    def _get_time_period_for_rank_type(self, rank_type: RankType, current_date) -> tuple:
-        """获取排行榜类型对应的时间段
-        
-        Args:
-            rank_type: 排行榜类型
-            current_date: 当前日期
-            
-        Returns:
-            tuple: (start_date, end_date)
-        """
-        if rank_type == RankType.DAILY:
-            return current_date, current_date
-        elif rank_type == RankType.WEEKLY:
-            # 获取本周开始日期(周一)
-            week_start = get_week_start(current_date)
-            return week_start, current_date
-        elif rank_type == RankType.MONTHLY:
-            # 获取本月开始日期
-            month_start = get_month_start(current_date)
-            return month_start, current_date
-        else:
-            # 总榜不需要时间段过滤
-            return None, None
-    
-    def _generate_title(self, rank_type: RankType) -> str:
+    def _generate_title(self, rank_type: RankType, now: datetime) -> str:
         """生成标题
         
         Args:
             rank_type: 排行榜类型
+            now: 当前时间
             
         Returns:
             str: 排行榜标题
         """
-        now = datetime.now()
-        
-        if rank_type == RankType.TOTAL:
-            return "总发言排行榜"
-        elif rank_type == RankType.DAILY:
-            return f"今日[{now.year}年{now.month}月{now.day}日]发言榜单"
-        elif rank_type == RankType.WEEKLY:
-            # 计算周数
-            week_num = now.isocalendar().week
-            return f"本周[{now.year}年{now.month}月第{week_num}周]发言榜单"
-        elif rank_type == RankType.MONTHLY:
-            return f"本月[{now.year}年{now.month}月]发言榜单"
-        else:
-            return "发言榜单"
+        return format_rank_title(rank_type, now)
     
     async def _refresh_nickname_cache_for_timer_push(self, group_id: str, group_data):
         """定时推送前强制刷新昵称缓存，确保显示最新昵称"""
@@ -897,47 +869,6 @@ class TimerManager:
         except Exception as e:
             self.logger.warning(f"定时推送前刷新昵称缓存失败: {e}")
     
-    def _generate_text_message(self, users_with_values: List[tuple], group_info: GroupInfo, title: str, config) -> str:
-        """生成文字消息
-        
-        Args:
-            users_with_values: 包含(UserData, sort_value)元组的列表
-            group_info: 群组信息
-            title: 排行榜标题
-            config: 插件配置对象
-            
-        Returns:
-            str: 格式化的文字消息
-        """
-        # 计算时间段内的总发言数
-        total_messages = sum(sort_value for _, sort_value in users_with_values)
-        
-        # 数据已经在_show_rank中排好序，直接使用并限制数量
-        top_users = users_with_values[:config.rand]
-        
-        msg = [f"{title}\n发言总数: {total_messages}\n━━━━━━━━━━━━━━\n"]
-        
-        for i, (user, user_messages) in enumerate(top_users):
-            # 使用时间段内的发言数计算百分比
-            percentage = ((user_messages / total_messages) * 100) if total_messages > 0 else 0
-            
-            # 添加排名表情
-            if i == 0:
-                emoji = "🥇"
-            elif i == 1:
-                emoji = "🥈"
-            elif i == 2:
-                emoji = "🥉"
-            else:
-                emoji = f"{i + 1}."
-            
-            msg.append(f"{emoji} {user.nickname}·{user_messages}次(占比{percentage:.2f}%)\n")
-        
-        # 添加推送标识
-        msg.append(f"\n🤖 定时推送 | {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        
-        return ''.join(msg)
-    
     async def get_status(self) -> Dict[str, Any]:
         """获取定时任务状态
         
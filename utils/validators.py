@@ -5,6 +5,7 @@
 
 import re
 import asyncio
+import functools
 from pathlib import Path
 from typing import Any, Optional, List, Dict, Callable
 from datetime import datetime, date
@@ -27,6 +28,11 @@ USER_ID_MAX_LENGTH = 20
 
 NICKNAME_MAX_LENGTH = 50
 
+# ID验证结果缓存容量（ID验证是纯函数，同一ID只需验证一次）
+ID_VALIDATION_CACHE_SIZE = 4096
+# 可以作为验证缓存键的ID类型（按精确类型判断：bool 与 1/0 哈希相同，不走缓存）
+_CACHEABLE_ID_TYPES = (str, int)
+
 IMAGE_MODE_TEXT = 0
 IMAGE_MODE_IMAGE = 1
 
@@ -106,6 +112,15 @@ class Validators:
             '123456789'
             >>> Validators.validate_group_id("")  # 抛出异常
         """
+        # 只有 str/int 输入使用缓存，其他类型（包括不可哈希的对象）按原逻辑直接验证
+        if type(group_id) in _CACHEABLE_ID_TYPES:
+            return Validators._validate_group_id_cached(group_id)
+        return Validators._validate_group_id_cached.__wrapped__(group_id)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=ID_VALIDATION_CACHE_SIZE)
+    def _validate_group_id_cached(group_id: Any) -> str:
+        """验证群组ID（带结果缓存，仅由 validate_group_id 以 str/int 参数调用）"""
         if not group_id:
             raise ValidationError("群组ID不能为空")
         
@@ -143,6 +158,15 @@ class Validators:
             '987654321'
             >>> Validators.validate_user_id("abc")  # 抛出异常
         """
+        # 只有 str/int 输入使用缓存，其他类型（包括不可哈希的对象）按原逻辑直接验证
+        if type(user_id) in _CACHEABLE_ID_TYPES:
+            return Validators._validate_user_id_cached(user_id)
+        return Validators._validate_user_id_cached.__wrapped__(user_id)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=ID_VALIDATION_CACHE_SIZE)
+    def _validate_user_id_cached(user_id: Any) -> str:
+        """验证用户ID（带结果缓存，仅由 validate_user_id 以 str/int 参数调用）"""
         if not user_id:
             raise ValidationError("用户ID不能为空")
         